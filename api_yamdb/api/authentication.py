@@ -0,0 +1,57 @@
+from django.db.models import DEFERRED
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+from users.signals import (USER_CLAIM_FIELDS, cache_user_state,
+                           get_user_state)
+
+
+class RoleAccessToken(AccessToken):
+    """
+    Access-токен с username, ролью, правами пользователя и ревизией
+    токенов, по которой отклоняются токены, выданные до смены этих полей.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for field in USER_CLAIM_FIELDS + ('token_revision',):
+            token[field] = getattr(user, field)
+        cache_user_state(user)
+        return token
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT без загрузки всего пользователя.
+    Username, роль и права берутся из токена. Ревизия токенов
+    и активность читаются из БД через кеш с коротким временем жизни:
+    смена имени, роли или прав увеличивает ревизию, и токен с устаревшими
+    полями отклоняется. Остальные поля отложены и загружаются из БД
+    только при обращении. Токены без ревизии обрабатываются
+    как в JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token
+               for claim in USER_CLAIM_FIELDS + ('token_revision',)):
+            return super().get_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        state = get_user_state(user_id)
+        if state is None or not state['is_active']:
+            raise AuthenticationFailed('Пользователь не найден или отключён',
+                                       code='user_not_found')
+        if state['token_revision'] != validated_token['token_revision']:
+            raise AuthenticationFailed(
+                'Имя, роль или права пользователя изменились, '
+                'получите новый токен',
+                code='token_revoked')
+        values = {api_settings.USER_ID_FIELD: user_id, **state}
+        for field in USER_CLAIM_FIELDS:
+            values[field] = validated_token[field]
+        fields = [field.attname for field in User._meta.concrete_fields]
+        return User.from_db(User.objects.db, fields,
+                            [values.get(field, DEFERRED) for field in fields])
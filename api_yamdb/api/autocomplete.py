@@ -0,0 +1,130 @@
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+
+from reviews import versions
+from reviews.models import Category, Genre, Title
+
+# Область данных названий: обновляется при изменении произведений,
+# жанров и категорий в любом процессе.
+AUTOCOMPLETE_SCOPE = 'autocomplete'
+
+SOURCES = {
+    'title': (Title, ('id', 'name')),
+    'genre': (Genre, ('id', 'name', 'slug')),
+    'category': (Category, ('id', 'name', 'slug')),
+}
+
+
+def normalize(text):
+    return text.casefold().replace('ё', 'е')
+
+
+class PrefixIndex:
+    """
+    Отсортированный в памяти индекс названий для автодополнения.
+    Каждое название индексируется с начала каждого слова, поиск
+    по префиксу — бинарный, без обращения к БД. Индекс строится
+    при первом запросе и обновляется сигналами моделей после фиксации
+    транзакции. Изменения других процессов и импорты учитываются
+    по версиям данных в БД: не чаще раза в AUTOCOMPLETE_CHECK_INTERVAL
+    секунд индекс сверяет их с версиями при построении и при
+    расхождении перестраивается.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = []
+        self.keys = {}
+        self.built = False
+        self.versions = None
+        self.checked = 0
+
+    def get_versions(self):
+        return versions.get_versions((versions.ALL, AUTOCOMPLETE_SCOPE))
+
+    def is_stale(self):
+        """Изменились ли данные с момента построения индекса."""
+        now = time.monotonic()
+        if now - self.checked < settings.AUTOCOMPLETE_CHECK_INTERVAL:
+            return False
+        self.checked = now
+        return self.get_versions() != self.versions
+
+    def make_entries(self, kind, obj):
+        """Ключи индекса: название с начала каждого слова."""
+        name = normalize(obj['name'])
+        return [
+            (name[match.start():], kind, obj['id'], obj['name'],
+             obj.get('slug'))
+            for match in re.finditer(r'\w+', name)
+        ]
+
+    def build(self):
+        # Версии читаются до данных: изменение во время построения
+        # приведёт к следующему перестроению.
+        data_versions = self.get_versions()
+        entries, keys = [], {}
+        for kind, (model, fields) in SOURCES.items():
+            for obj in model.objects.values(*fields).iterator():
+                keys[kind, obj['id']] = self.make_entries(kind, obj)
+                entries.extend(keys[kind, obj['id']])
+        entries.sort()
+        with self.lock:
+            self.entries, self.keys, self.built = entries, keys, True
+            self.versions, self.checked = data_versions, time.monotonic()
+
+    def remove(self, kind, pk):
+        with self.lock:
+            for entry in self.keys.pop((kind, pk), ()):
+                position = bisect_left(self.entries, entry)
+                if (position < len(self.entries)
+                        and self.entries[position] == entry):
+                    del self.entries[position]
+
+    def update(self, kind, instance):
+        if not self.built:
+            return
+        self.remove(kind, instance.pk)
+        obj = {field: getattr(instance, field)
+               for field in SOURCES[kind][1]}
+        entries = self.make_entries(kind, obj)
+        with self.lock:
+            self.keys[kind, instance.pk] = entries
+            for entry in entries:
+                insort(self.entries, entry)
+
+    def search(self, prefix, limit=10, kinds=tuple(SOURCES)):
+        """
+        Первые limit объектов, название которых содержит слово,
+        начинающееся с prefix.
+        """
+        if not self.built or self.is_stale():
+            self.build()
+        prefix = normalize(prefix.strip())
+        found = {}
+        with self.lock:
+            position = bisect_left(self.entries, (prefix,))
+            while len(found) < limit and position < len(self.entries):
+                text, kind, pk, name, slug = self.entries[position]
+                if not text.startswith(prefix):
+                    break
+                position += 1
+                if kind not in kinds or (kind, pk) in found:
+                    continue
+                found[kind, pk] = {'type': kind, 'id': pk, 'name': name}
+                if slug is not None:
+                    found[kind, pk]['slug'] = slug
+        return list(found.values())
+
+    def reset(self):
+        """Сбрасывает индекс, он будет построен заново при запросе."""
+        with self.lock:
+            self.entries, self.keys, self.built = [], {}, False
+            self.versions, self.checked = None, 0
+
+
+prefix_index = PrefixIndex()
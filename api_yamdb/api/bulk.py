@@ -0,0 +1,197 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .permissions import IsRoleAdmin
+from .serializers import sort_genres
+from reviews.bulk import (create_groups, create_titles, update_groups,
+                          update_titles)
+from reviews.models import Category, Genre, Title
+
+
+class BulkMixin:
+    """
+    Массовые операции администратора: POST, PATCH и DELETE <prefix>/bulk/.
+    Список проверяется целиком, связанные объекты загружаются одним
+    запросом на модель, запись выполняется в одной транзакции.
+    При ошибках возвращается список ошибок по позициям и ничего
+    не сохраняется.
+    """
+
+    bulk_serializer_class = None
+    bulk_lookup_field = 'id'
+
+    @action(methods=['post', 'patch', 'delete'], detail=False,
+            permission_classes=(IsRoleAdmin,))
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            return self.bulk_error('Ожидается список объектов.')
+        if len(items) > settings.BULK_MAX_ITEMS:
+            return self.bulk_error(
+                f'Не более {settings.BULK_MAX_ITEMS} объектов за запрос.')
+        with transaction.atomic():
+            if request.method == 'DELETE':
+                return self.bulk_delete(items)
+            serializer = self.bulk_serializer_class(
+                data=items, many=True, partial=request.method == 'PATCH')
+            if not serializer.is_valid():
+                return Response(
+                    serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            if request.method == 'POST':
+                return self.bulk_create(serializer.validated_data)
+            return self.bulk_update(serializer.validated_data)
+
+    def bulk_error(self, message):
+        return Response({'non_field_errors': [message]},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    def get_bulk_instances(self, items, errors):
+        """Изменяемые объекты одним запросом; ненайденные — в errors."""
+        field = self.bulk_lookup_field
+        keys = [item.get(field) for item in items]
+        instances = self.get_queryset().in_bulk(
+            [key for key in keys if key is not None], field_name=field)
+        for index, key in enumerate(keys):
+            if key is None:
+                errors[index][field] = ['Обязательное поле.']
+            elif key not in instances:
+                errors[index][field] = [f'Объект {key} не найден.']
+        return instances
+
+    def bulk_delete(self, keys):
+        """
+        Идентификаторы приводятся к типу поля поиска: ["1"] и [1]
+        удаляют один и тот же объект.
+        """
+        message = 'Ожидается список идентификаторов.'
+        if any(isinstance(key, bool) or not isinstance(key, (int, str))
+               for key in keys):
+            return self.bulk_error(message)
+        model = self.get_queryset().model
+        field = self.bulk_lookup_field
+        lookup = model._meta.get_field(field)
+        try:
+            values = [lookup.to_python(key) for key in keys]
+        except ValidationError:
+            return self.bulk_error(message)
+        queryset = model.objects.filter(**{f'{field}__in': values})
+        found = set(queryset.values_list(field, flat=True))
+        missing = [key for key, value in zip(keys, values)
+                   if value not in found]
+        if missing:
+            return Response({'not_found': missing},
+                            status=status.HTTP_400_BAD_REQUEST)
+        queryset.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class GroupBulkMixin(BulkMixin):
+    """Массовые операции с жанрами или категориями по slug."""
+
+    bulk_lookup_field = 'slug'
+
+    def bulk_create(self, items):
+        model = self.get_queryset().model
+        slugs = [item['slug'] for item in items]
+        existing = set(model.objects.filter(
+            slug__in=slugs).values_list('slug', flat=True))
+        errors = [{} for _ in items]
+        seen = set()
+        for index, slug in enumerate(slugs):
+            if slug in existing or slug in seen:
+                errors[index]['slug'] = [f'Slug {slug} уже используется.']
+            seen.add(slug)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        groups = [model(**item) for item in items]
+        create_groups(model, groups)
+        return Response(self.get_serializer(groups, many=True).data,
+                        status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, items):
+        errors = [{} for _ in items]
+        instances = self.get_bulk_instances(items, errors)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        groups = []
+        for item in items:
+            group = instances[item['slug']]
+            group.name = item.get('name', group.name)
+            groups.append(group)
+        update_groups(self.get_queryset().model, groups)
+        return Response(self.get_serializer(groups, many=True).data)
+
+
+class TitleBulkMixin(BulkMixin):
+    """Массовые операции с произведениями по id."""
+
+    def resolve(self, items, errors):
+        """Жанры и категории всех произведений двумя IN-запросами."""
+        genres = Genre.objects.in_bulk(
+            {slug for item in items for slug in item.get('genre', ())},
+            field_name='slug')
+        categories = Category.objects.in_bulk(
+            {item['category'] for item in items if 'category' in item},
+            field_name='slug')
+        for index, item in enumerate(items):
+            missing = [slug for slug in item.get('genre', ())
+                       if slug not in genres]
+            if missing:
+                errors[index]['genre'] = [
+                    f'Жанры не найдены: {", ".join(missing)}']
+            if 'category' in item and item['category'] not in categories:
+                errors[index]['category'] = [
+                    f'Категория {item["category"]} не найдена.']
+        return genres, categories
+
+    def bulk_create(self, items):
+        errors = [{} for _ in items]
+        genres, categories = self.resolve(items, errors)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        titles = []
+        for item in items:
+            data = dict(item)
+            data.pop('id', None)
+            title_genres = sort_genres(
+                genres[slug] for slug in data.pop('genre'))
+            data['category'] = categories[data.pop('category')]
+            titles.append((Title(**data), title_genres))
+        create_titles(titles)
+        return Response(self.bulk_representation(titles),
+                        status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, items):
+        errors = [{} for _ in items]
+        instances = self.get_bulk_instances(items, errors)
+        genres, categories = self.resolve(items, errors)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        titles = []
+        fields = set()
+        for item in items:
+            data = dict(item)
+            title = instances[data.pop('id')]
+            title_genres = None
+            if 'genre' in data:
+                title_genres = sort_genres(
+                    genres[slug] for slug in data.pop('genre'))
+            if 'category' in data:
+                data['category'] = categories[data.pop('category')]
+            for field, value in data.items():
+                setattr(title, field, value)
+            fields.update(data)
+            titles.append((title, title_genres))
+        update_titles(titles, sorted(fields))
+        return Response(self.bulk_representation(titles))
+
+    def bulk_representation(self, titles):
+        for title, genres in titles:
+            if genres is not None:
+                title.loaded_genres = genres
+        return self.serializer_class(
+            [title for title, _ in titles], many=True).data
@@ -0,0 +1,81 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import urlencode
+
+from reviews import versions
+
+COUNTER_KEY = 'response-{}:{}'
+
+_pending = threading.local()
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def get_key(request, name, scopes):
+    """
+    Ключ ответа: эндпоинт, нормализованные параметры запроса, общая
+    версия данных и версии данных, от которых зависит ответ. Вторым
+    значением возвращается время последнего изменения этих данных
+    в секундах или None, если данные не изменялись.
+    """
+    scope_versions = versions.get_versions(
+        (versions.ALL,) + tuple(scopes))
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    version = '.'.join(str(value) for value in scope_versions)
+    key = (f'response:{name}:{request.get_host()}{request.path}'
+           f'?{query}:{version}')
+    return key, max(scope_versions) // 1000 or None
+
+
+def increment(key):
+    """Атомарное увеличение счётчика в кеше."""
+    cache = get_cache()
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def invalidate(*scopes):
+    """
+    Обновляет версии данных в БД после фиксации транзакции: устаревшие
+    ответы больше не читаются ни одним процессом, а данные до фиксации
+    не кешируются под новой версией. Области одной транзакции
+    обновляются вместе, одним запросом.
+    """
+    if not hasattr(_pending, 'scopes'):
+        _pending.scopes = set()
+    _pending.scopes.update(scopes)
+    transaction.on_commit(flush)
+
+
+def flush():
+    """Обновляет версии накопленных областей данных."""
+    scopes, _pending.scopes = _pending.scopes, set()
+    if scopes:
+        versions.bump(*sorted(scopes))
+
+
+def count(name, event):
+    """Счётчик попаданий (hit) и промахов (miss) кеша эндпоинта."""
+    increment(COUNTER_KEY.format(event, name))
+
+
+def get_stats(names):
+    """Значения счётчиков попаданий и промахов по эндпоинтам."""
+    keys = {
+        (name, event): COUNTER_KEY.format(event, name)
+        for name in names for event in ('hit', 'miss')
+    }
+    values = get_cache().get_many(keys.values())
+    return {
+        name: {event: values.get(keys[name, event], 0)
+               for event in ('hit', 'miss')}
+        for name in names
+    }
@@ -1,6 +1,20 @@
+from django.db.models import Count, F
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
 
-from reviews.models import Title
+from reviews.genre_masks import get_genre_bits, get_mask
+from reviews.models import GenreTitle, Title
+from reviews.search import get_search_backend
+
+
+GENRE_MODES = (
+    ('any', 'Любой из жанров'),
+    ('all', 'Все жанры'),
+)
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Фильтр по списку значений через запятую."""
 
 
 class TitleFilter(filters.FilterSet):
@@ -10,19 +24,117 @@ class TitleFilter(filters.FilterSet):
         field_name='name',
         lookup_expr='contains'
     )
-    category = filters.CharFilter(
+    category = CharInFilter(
         field_name='category__slug',
-        lookup_expr='icontains'
+        lookup_expr='in'
     )
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
+    genre = CharInFilter(method='filter_genre')
+    genre_exclude = CharInFilter(method='filter_genre_exclude')
+    genre_mode = filters.ChoiceFilter(
+        choices=GENRE_MODES,
+        method='filter_genre_mode'
     )
     year = filters.NumberFilter(
         field_name='year',
         lookup_expr='exact'
     )
+    year_min = filters.NumberFilter(
+        field_name='year',
+        lookup_expr='gte'
+    )
+    year_max = filters.NumberFilter(
+        field_name='year',
+        lookup_expr='lte'
+    )
+    rating_min = filters.NumberFilter(
+        field_name='rating',
+        lookup_expr='gte'
+    )
+    rating_max = filters.NumberFilter(
+        field_name='rating',
+        lookup_expr='lte'
+    )
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = '__all__'
+        # Служебные колонки (маска жанров, суммы оценок, популярность)
+        # не фильтруются.
+        fields = (
+            'id', 'name', 'year', 'description', 'category', 'genre',
+            'genre_exclude', 'genre_mode', 'year_min', 'year_max',
+            'rating_min', 'rating_max', 'search')
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Точный поиск по slug жанров через маску жанров произведения.
+        При genre_mode=all произведение должно иметь все жанры.
+        """
+        slugs = set(value)
+        match_all = self.form.cleaned_data.get('genre_mode') == 'all'
+        bits = get_genre_bits(slugs)
+        if None in bits.values():
+            return self.filter_genre_links(queryset, slugs, match_all)
+        if not bits or match_all and len(bits) < len(slugs):
+            return queryset.none()
+        mask = get_mask(bits.values())
+        queryset = queryset.annotate(
+            genre_hits=F('genre_mask').bitand(mask))
+        if match_all:
+            return queryset.filter(genre_hits=mask)
+        return queryset.filter(genre_hits__gt=0)
+
+    def filter_genre_links(self, queryset, slugs, match_all):
+        """
+        Поиск через подзапрос к GenreTitle для жанров без бита в маске.
+        """
+        title_ids = GenreTitle.objects.filter(
+            genre__slug__in=slugs).values('title_id')
+        if match_all:
+            title_ids = title_ids.annotate(
+                genres=Count('genre_id', distinct=True)
+            ).filter(genres=len(slugs)).values('title_id')
+        return queryset.filter(id__in=title_ids)
+
+    def filter_genre_exclude(self, queryset, name, value):
+        """Исключает произведения с любым из указанных жанров."""
+        bits = get_genre_bits(set(value))
+        if None in bits.values():
+            return queryset.exclude(id__in=GenreTitle.objects.filter(
+                genre__slug__in=value).values('title_id'))
+        if not bits:
+            return queryset
+        return queryset.annotate(
+            genre_misses=F('genre_mask').bitand(get_mask(bits.values()))
+        ).filter(genre_misses=0)
+
+    def filter_genre_mode(self, queryset, name, value):
+        """Режим учитывается в filter_genre."""
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию."""
+        return get_search_backend().search(queryset, value)
+
+
+class RelevanceOrderingFilter(OrderingFilter):
+    """
+    Сортировка произведений.
+    Результаты поиска без явного ordering упорядочены по релевантности.
+    К сортировке добавляется id в том же направлении, что и первое поле,
+    чтобы порядок был однозначным и совпадал с составными индексами.
+    """
+    tiebreaker = 'id'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view) or ())
+        if ordering and not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            descending = ordering[0].startswith('-')
+            ordering.append(
+                f'-{self.tiebreaker}' if descending else self.tiebreaker)
+        return ordering
+
+    def get_default_ordering(self, view):
+        if view.request.query_params.get('search'):
+            return ('search_rank', 'id')
+        return super().get_default_ordering(view)
@@ -1,12 +1,159 @@
-from rest_framework import filters, mixins, viewsets
+import hashlib
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import filters, generics, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
 from rest_framework.serializers import BaseSerializer
 
+from . import cache
 from .permissions import AdminOrReadOnly
 from users.validators import validate_username
 
 
-class CreateListDestroyViewSet(mixins.CreateModelMixin,
+class CachedResponseMixin:
+    """
+    Условные GET-запросы (ETag, Last-Modified) и кеширование ответов
+    анонимным пользователям. Вьюсет перечисляет в get_cache_scopes данные,
+    от которых зависит ответ; при их изменении сигналы и команды
+    обновляют версии этих данных в БД, и ETag, Last-Modified и кеш
+    устаревают во всех процессах. Условные заголовки проверяются только
+    после того, как найдены объект и родительские объекты из url.
+    """
+
+    cache_scopes = ()
+
+    def get_cache_scopes(self):
+        return self.cache_scopes
+
+    def get_object(self):
+        """Объект загружается один раз за запрос."""
+        if getattr(self, '_object', None) is None:
+            self._object = super().get_object()
+        return self._object
+
+    def check_objects(self):
+        """
+        404 для отсутствующих объектов из url до проверки условных
+        заголовков. Объект retrieve сразу загружается для ответа,
+        для остальных detail-действий проверяется только его наличие.
+        """
+        if self.action == 'retrieve':
+            self.get_object()
+        elif self.detail:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            generics.get_object_or_404(
+                self.get_queryset().select_related(None).prefetch_related(
+                    None).only('pk'),
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        else:
+            self.get_queryset()
+
+    def cached_response(self, method, request, *args, **kwargs):
+        self.check_objects()
+        key, last_modified = cache.get_key(
+            request, self.basename, self.get_cache_scopes())
+        etag = quote_etag(hashlib.md5(
+            f'{key}:{request.accepted_renderer.format}'.encode()).hexdigest())
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+        if request.user.is_authenticated:
+            response = method(request, *args, **kwargs)
+        else:
+            response = self.anonymous_response(
+                key, method, request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def anonymous_response(self, key, method, request, *args, **kwargs):
+        data = cache.get_cache().get(key)
+        if data is not None:
+            cache.count(self.basename, 'hit')
+            return Response(data)
+        cache.count(self.basename, 'miss')
+        response = method(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.get_cache().set(
+                key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class SparseFieldsMixin:
+    """
+    Частичные ответы: ?fields=id,name ограничивает поля сериализатора
+    в действиях sparse_actions и столбцы запроса.
+    sparse_fields — поле сериализатора -> столбцы для only(),
+    sparse_select_related и sparse_prefetch_related — связи, которые
+    загружаются только для запрошенных полей, sparse_required — столбцы,
+    нужные всегда (например, для сортировки и курсора пагинации).
+    """
+
+    fields_query_param = 'fields'
+    sparse_actions = ('list', 'retrieve')
+    sparse_fields = {}
+    sparse_select_related = {}
+    sparse_prefetch_related = {}
+    sparse_required = ('id',)
+
+    def get_sparse_fields(self):
+        """Запрошенные поля или None, если ответ полный."""
+        value = self.request.query_params.get(self.fields_query_param)
+        if not value or self.action not in self.sparse_actions:
+            return None
+        fields = [field.strip() for field in value.split(',')
+                  if field.strip()]
+        unknown = [field for field in fields
+                   if field not in self.sparse_fields]
+        if unknown:
+            raise ValidationError({self.fields_query_param: (
+                f'Неизвестные поля: {", ".join(unknown)}. Доступные поля: '
+                f'{", ".join(self.sparse_fields)}.')})
+        return set(fields)
+
+    def get_sparse_queryset(self, queryset):
+        """Загружает только столбцы и связи запрошенных полей."""
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        queryset = queryset.select_related(None).prefetch_related(None)
+        select = [self.sparse_select_related[field] for field in fields
+                  if field in self.sparse_select_related]
+        if select:
+            queryset = queryset.select_related(*select)
+        prefetch = [self.sparse_prefetch_related[field] for field in fields
+                    if field in self.sparse_prefetch_related]
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        columns = set(self.sparse_required)
+        for field in fields:
+            columns.update(self.sparse_fields[field])
+        return queryset.only(*columns)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            child = getattr(serializer, 'child', serializer)
+            for name in set(child.fields) - fields:
+                child.fields.pop(name)
+        return serializer
+
+
+class CreateListDestroyViewSet(CachedResponseMixin,
+                               mixins.CreateModelMixin,
                                mixins.ListModelMixin,
                                mixins.DestroyModelMixin,
                                viewsets.GenericViewSet):
@@ -21,6 +168,42 @@ class CreateListDestroyViewSet(mixins.CreateModelMixin,
     lookup_field = 'slug'
 
 
+class LeaderboardMixin:
+    """
+    Рейтинг лучших произведений жанра или категории: /<slug>/top/.
+    Читается из заранее рассчитанного списка, ?limit= ограничивает
+    количество мест.
+    """
+
+    leaderboard_serializer_class = None
+
+    def get_cache_scopes(self):
+        if self.action == 'top':
+            return ('titles',)
+        return super().get_cache_scopes()
+
+    @action(detail=True)
+    def top(self, request, slug=None):
+        return self.cached_response(self.get_top, request, slug=slug)
+
+    def get_top(self, request, slug=None):
+        try:
+            limit = min(
+                int(request.query_params.get(
+                    'limit', settings.LEADERBOARD_SIZE)),
+                settings.LEADERBOARD_SIZE)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response({'limit': 'Ожидается положительное целое число.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        group = get_object_or_404(self.get_queryset().only('id'), slug=slug)
+        entries = group.leaderboard.select_related(
+            'title__category').prefetch_related('title__genre')[:limit]
+        return Response(
+            self.leaderboard_serializer_class(entries, many=True).data)
+
+
 class UsernameSerializer(BaseSerializer):
     """Сериализатор для username."""
     def validate_username(self, username):
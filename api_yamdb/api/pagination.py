@@ -0,0 +1,60 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Keyset-пагинация отзывов и комментариев по дате публикации."""
+    ordering = ('-pub_date', 'id')
+    page_size_query_param = 'limit'
+
+
+class NameCursorPagination(CursorPagination):
+    """Keyset-пагинация произведений по названию."""
+    ordering = ('name', 'id')
+    page_size_query_param = 'limit'
+
+
+class OptionalCursorPagination(LimitOffsetPagination):
+    """
+    По умолчанию пагинация limit/offset.
+    При ?pagination=cursor или переданном cursor используется
+    keyset-пагинация без подсчёта общего количества объектов.
+    """
+    mode_query_param = 'pagination'
+    cursor_pagination_class = PubDateCursorPagination
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class TitlePagination(OptionalCursorPagination):
+    """
+    Пагинация произведений с keyset-режимом по названию или году.
+    Рейтинг может быть NULL, поэтому при сортировке по рейтингу
+    используется limit/offset.
+    """
+    cursor_pagination_class = NameCursorPagination
+    nullable_ordering_fields = ('rating',)
+
+    def use_cursor(self, request):
+        ordering = request.query_params.get('ordering', '')
+        fields = {field.strip().lstrip('-') for field in ordering.split(',')}
+        if fields & set(self.nullable_ordering_fields):
+            return False
+        return super().use_cursor(request)
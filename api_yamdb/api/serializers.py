@@ -1,11 +1,12 @@
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
 from .mixins import UsernameSerializer
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry,
+                            Review, ScoreDistribution, SimilarTitle, Title)
 from reviews.validators import validate_year
 from users.models import User
 
@@ -71,46 +72,147 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
 
 
+class TitleGenresSerializer(serializers.ListSerializer):
+    """
+    Жанры произведения. Если жанры уже загружены при записи
+    и сохранены в атрибуте loaded_genres, они не загружаются повторно.
+    """
+    def get_attribute(self, instance):
+        genres = getattr(instance, 'loaded_genres', None)
+        if genres is not None:
+            return genres
+        return super().get_attribute(instance)
+
+
 class TitleSerializer(serializers.ModelSerializer):
     """Сериализатор для произведения."""
-    genre = GenreSerializer(many=True)
+    genre = TitleGenresSerializer(child=GenreSerializer())
     category = CategorySerializer()
-    rating = serializers.IntegerField(default=1)
+    rating = serializers.IntegerField(read_only=True)
     year = serializers.IntegerField(validators=[MinValueValidator(0),
                                                 validate_year, ])
 
     class Meta:
         fields = (
-            'id', 'name', 'year', 'rating', 'description', 'genre', 'category')
+            'id', 'name', 'year', 'rating', 'review_count', 'description',
+            'genre', 'category')
         model = Title
         read_only_fields = (
-            'id', 'name', 'year', 'rating', 'description', 'genre', 'category')
+            'id', 'name', 'year', 'rating', 'review_count', 'description',
+            'genre', 'category')
+
+
+def sort_genres(genres):
+    """Жанры без повторов в порядке сортировки модели."""
+    return sorted({genre.pk: genre for genre in genres}.values(),
+                  key=lambda genre: (genre.name, genre.pk))
 
 
 class TitlePostSerialzier(serializers.ModelSerializer):
-    """Сериализатор для POST, PATCH, PUT произведения."""
-    genre = serializers.SlugRelatedField(
-        slug_field='slug',
-        queryset=Genre.objects.all(),
-        many=True
-    )
+    """
+    Сериализатор для POST, PATCH, PUT произведения.
+    Жанры загружаются одним IN-запросом, ответ строится из уже
+    загруженных объектов.
+    """
+    genre = serializers.ListField(child=serializers.SlugField())
     category = serializers.SlugRelatedField(
         slug_field='slug',
         queryset=Category.objects.all()
     )
-    rating = serializers.IntegerField(required=False)
+    rating = serializers.IntegerField(read_only=True)
     year = serializers.IntegerField(validators=[MinValueValidator(0),
                                                 validate_year, ])
 
     class Meta:
         model = Title
         fields = (
-            'id', 'name', 'year', 'rating', 'description', 'genre', 'category')
+            'id', 'name', 'year', 'rating', 'review_count', 'description',
+            'genre', 'category')
+
+    def validate_genre(self, slugs):
+        genres = {genre.slug: genre
+                  for genre in Genre.objects.filter(slug__in=set(slugs))}
+        missing = [slug for slug in slugs if slug not in genres]
+        if missing:
+            raise serializers.ValidationError(
+                f'Жанры не найдены: {", ".join(missing)}')
+        return sort_genres(genres.values())
+
+    @transaction.atomic
+    def create(self, validated_data):
+        genres = validated_data.pop('genre')
+        title = Title.objects.create(**validated_data)
+        title.genre.add(*genres)
+        title.loaded_genres = genres
+        return title
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        genres = validated_data.pop('genre', None)
+        instance = super().update(instance, validated_data)
+        if genres is not None:
+            instance.genre.set(genres)
+            instance.loaded_genres = genres
+        return instance
 
     def to_representation(self, instance):
         return TitleSerializer(instance).data
 
 
+class BulkGroupSerializer(serializers.Serializer):
+    """
+    Жанр или категория в массовой операции.
+    Уникальность slug проверяется одним запросом для всего списка.
+    """
+    name = serializers.CharField(max_length=settings.LIMIT_NAME)
+    slug = serializers.SlugField(max_length=settings.LIMIT_SLUG)
+
+
+class BulkTitleSerializer(serializers.Serializer):
+    """
+    Произведение в массовой операции.
+    Жанры и категории загружаются одним запросом для всего списка.
+    """
+    id = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=settings.LIMIT_NAME)
+    year = serializers.IntegerField(validators=[MinValueValidator(0),
+                                                validate_year, ])
+    description = serializers.CharField(required=False, allow_blank=True)
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """Сериализатор места произведения в рейтинге."""
+    title = TitleSerializer(read_only=True)
+
+    class Meta:
+        fields = ('position', 'weighted_rating', 'title')
+        model = LeaderboardEntry
+
+
+class SimilarTitleSerializer(serializers.ModelSerializer):
+    """Сериализатор похожего произведения."""
+    title = TitleSerializer(source='similar', read_only=True)
+
+    class Meta:
+        fields = ('score', 'title')
+        model = SimilarTitle
+
+
+class ScoreDistributionSerializer(serializers.ModelSerializer):
+    """Сериализатор распределения оценок произведения."""
+    distribution = serializers.DictField(
+        source='counts', child=serializers.IntegerField())
+    count = serializers.IntegerField(source='total')
+    average = serializers.FloatField()
+    median = serializers.FloatField()
+
+    class Meta:
+        fields = ('title', 'distribution', 'count', 'average', 'median')
+        model = ScoreDistribution
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """Сериализатор для отзыва и оценки."""
     author = serializers.SlugRelatedField(
@@ -125,19 +227,21 @@ class ReviewSerializer(serializers.ModelSerializer):
     ])
 
     class Meta:
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = ('id', 'text', 'author', 'score', 'pub_date',
+                  'comment_count')
         model = Review
 
-    def validate(self, data):
-        """Валидация для отзыва."""
-        request = self.context['request']
-        title_id = self.context['view'].kwargs.get('title_id')
-        if request.method == 'POST' and Review.objects.filter(
-                title=get_object_or_404(Title, id=title_id),
-                author=request.user).exists():
+    def create(self, validated_data):
+        """
+        Повторный отзыв отклоняется ограничением unique_review,
+        без отдельного запроса на проверку существования.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
             raise serializers.ValidationError(
                 'Вы уже оставили отзыв к этому произведению!')
-        return data
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -0,0 +1,116 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .autocomplete import AUTOCOMPLETE_SCOPE, prefix_index
+from .cache import invalidate
+from reviews.bulk import bulk_saved
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.signals import get_deleting_reviews
+from reviews.trending import trending_decayed
+from users.models import User
+from users.signals import get_changed_fields
+
+
+@receiver((post_save, post_delete), sender=Genre)
+def genre_changed(sender, instance, **kwargs):
+    invalidate('genres', 'titles', 'catalog', AUTOCOMPLETE_SCOPE)
+
+
+@receiver((post_save, post_delete), sender=Category)
+def category_changed(sender, instance, **kwargs):
+    invalidate('categories', 'titles', 'catalog', AUTOCOMPLETE_SCOPE)
+
+
+@receiver((post_save, post_delete), sender=Title)
+def title_changed(sender, instance, **kwargs):
+    invalidate('titles', f'title:{instance.pk}', AUTOCOMPLETE_SCOPE)
+
+
+@receiver((post_save, post_delete), sender=GenreTitle)
+def genre_title_changed(sender, instance, **kwargs):
+    invalidate('titles', f'title:{instance.title_id}')
+
+
+@receiver(m2m_changed, sender=GenreTitle)
+def title_genres_changed(sender, instance, action, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, Title):
+        invalidate('titles', f'title:{instance.pk}')
+    else:
+        invalidate('titles', 'catalog')
+
+
+@receiver((post_save, post_delete), sender=Review)
+def review_changed(sender, instance, **kwargs):
+    invalidate('titles', 'trending', f'title:{instance.title_id}',
+               f'reviews:{instance.title_id}')
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    scopes = ['trending', f'comments:{instance.review_id}']
+    # При каскадном удалении отзыва список отзывов сбрасывает
+    # review_changed, поэтому отзыв для каждого комментария не читается.
+    if Comment.review.is_cached(instance):
+        title_id = instance.review.title_id
+    elif instance.review_id in get_deleting_reviews():
+        title_id = None
+    else:
+        title_id = Review.objects.filter(pk=instance.review_id).values_list(
+            'title_id', flat=True).first()
+    if title_id is not None:
+        scopes.append(f'reviews:{title_id}')
+    invalidate(*scopes)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, raw=False, **kwargs):
+    if raw or created or 'username' not in get_changed_fields(instance):
+        return
+    title_ids = Review.objects.filter(author=instance).values_list(
+        'title_id', flat=True).distinct()
+    review_ids = Comment.objects.filter(author=instance).values_list(
+        'review_id', flat=True).distinct()
+    invalidate(*(f'reviews:{pk}' for pk in title_ids),
+               *(f'comments:{pk}' for pk in review_ids))
+
+
+@receiver(bulk_saved)
+def bulk_changed(sender, instances, **kwargs):
+    if sender is Title:
+        invalidate('titles', 'catalog', AUTOCOMPLETE_SCOPE)
+    elif sender is Genre:
+        invalidate('genres', 'titles', 'catalog', AUTOCOMPLETE_SCOPE)
+    elif sender is Category:
+        invalidate('categories', 'titles', 'catalog', AUTOCOMPLETE_SCOPE)
+    kind = sender._meta.model_name
+
+    def update_index():
+        for instance in instances:
+            prefix_index.update(kind, instance)
+
+    transaction.on_commit(update_index)
+
+
+@receiver(trending_decayed)
+def trending_changed(sender, **kwargs):
+    invalidate('trending')
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+def autocomplete_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        kind = sender._meta.model_name
+        transaction.on_commit(lambda: prefix_index.update(kind, instance))
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def autocomplete_deleted(sender, instance, **kwargs):
+    kind, pk = sender._meta.model_name, instance.pk
+    transaction.on_commit(lambda: prefix_index.remove(kind, pk))
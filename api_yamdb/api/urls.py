@@ -1,9 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, TokenView,
-                    ConfCodeView, UsersViewSet,)
+from .views import (AutocompleteView, CacheStatsView, CategoryViewSet,
+                    CommentViewSet, ExportView, GenreViewSet, ReviewViewSet,
+                    TitleViewSet, TokenView, ConfCodeView, UsersViewSet,)
 
 router_v1 = DefaultRouter()
 router_v1.register('titles', TitleViewSet, basename='titles')
@@ -22,5 +22,8 @@ urlpatterns = [
         path('signup/', ConfCodeView.as_view()),
         path('token/', TokenView.as_view())
     ])),
+    path('v1/autocomplete/', AutocompleteView.as_view()),
+    path('v1/cache-stats/', CacheStatsView.as_view()),
+    path('v1/export/<str:table>/', ExportView.as_view()),
     path('v1/', include(router_v1.urls)),
 ]
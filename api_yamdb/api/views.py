@@ -1,33 +1,45 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.db import IntegrityError
-from django.db.models import Avg
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 
-from .filters import TitleFilter
-from .mixins import CreateListDestroyViewSet
+from . import cache
+from .bulk import GroupBulkMixin, TitleBulkMixin
+from .authentication import RoleAccessToken
+from .autocomplete import SOURCES, prefix_index
+from .filters import RelevanceOrderingFilter, TitleFilter
+from .mixins import (CachedResponseMixin, CreateListDestroyViewSet,
+                     LeaderboardMixin, SparseFieldsMixin)
+from .pagination import OptionalCursorPagination, TitlePagination
 from .permissions import (IsAuthorModerAdminOrReadOnly, AdminOrReadOnly,
                           IsRoleAdmin)
 from .serializers import (
-    CategorySerializer, CommentSerializer, GenreSerializer,
-    NotAdminUserSerializer, ReviewSerializer, SignUpSerializer,
-    TitlePostSerialzier, TitleSerializer, TokenSerializer, UserSerializer
+    BulkGroupSerializer, BulkTitleSerializer, CategorySerializer,
+    CommentSerializer, GenreSerializer, LeaderboardEntrySerializer,
+    NotAdminUserSerializer, ReviewSerializer, ScoreDistributionSerializer,
+    SignUpSerializer, SimilarTitleSerializer, TitlePostSerialzier,
+    TitleSerializer, TokenSerializer, UserSerializer
 )
-from reviews.models import Category, Genre, Review, Title
-from users.models import User
+from reviews import similarity
+from reviews.datasets import EXPORT_FORMATS, get_table, iter_lines
+from reviews.models import (Category, Genre, Review, ScoreDistribution,
+                            SimilarTitle, Title)
+from users.models import OutgoingEmail, User
 
 
 class ConfCodeView(APIView):
-    """Регистрация пользователя и отправка кода подтверждения."""
+    """
+    Регистрация пользователя и постановка письма с кодом подтверждения
+    в очередь отправки.
+    """
     USERNAME_ERROR = 'Пользователь с таким username уже существует'
     EMAIL_ERROR = 'Пользователь с таким email уже существует'
 
@@ -45,13 +57,12 @@ class ConfCodeView(APIView):
                        self.USERNAME_ERROR)
             return Response(message, status=status.HTTP_400_BAD_REQUEST)
         confirmation_code = default_token_generator.make_token(user)
-        send_mail(
+        OutgoingEmail.objects.create(
             subject='Код подтверждения регистрации',
             message='Вы зарегистрировались на YAMDB!'
                     f'Ваш код подтвержения: {confirmation_code}',
             from_email=settings.ADMIN_EMAIL,
-            recipient_list=[email],
-            fail_silently=False,
+            recipient=email,
         )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -68,11 +79,60 @@ class TokenView(APIView):
             return Response(
                 {'Вы использовали неверный код подтверждения.'},
                 status=status.HTTP_400_BAD_REQUEST)
-        token = RefreshToken.for_user(user)
-        return Response({'token': str(token.access_token)},
+        token = RoleAccessToken.for_user(user)
+        return Response({'token': str(token)},
                         status=status.HTTP_200_OK)
 
 
+class ExportView(APIView):
+    """Потоковая выгрузка таблицы в csv или ndjson. Доступна администратору."""
+    permission_classes = (IsRoleAdmin,)
+
+    def get(self, request, table):
+        model = get_table(table)
+        if model is None:
+            return Response({'table': f'Неизвестная таблица: {table}'},
+                            status=status.HTTP_404_NOT_FOUND)
+        export_format = request.query_params.get('output', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'output': f'Доступные форматы: {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST)
+        response = StreamingHttpResponse(
+            iter_lines(model, export_format),
+            content_type=EXPORT_FORMATS[export_format])
+        response['Content-Disposition'] = (
+            f'attachment; filename="{table}.{export_format}"')
+        return response
+
+
+class AutocompleteView(APIView):
+    """Автодополнение названий произведений, жанров и категорий."""
+
+    def get(self, request):
+        prefix = request.query_params.get('q', '')
+        kinds = request.query_params.get('type')
+        kinds = tuple(kinds.split(',')) if kinds else tuple(SOURCES)
+        try:
+            limit = min(int(request.query_params.get('limit', 10)),
+                        settings.AUTOCOMPLETE_MAX_LIMIT)
+        except ValueError:
+            return Response({'limit': 'Ожидается целое число.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not prefix.strip():
+            return Response([])
+        return Response(prefix_index.search(prefix, limit, kinds))
+
+
+class CacheStatsView(APIView):
+    """Счётчики попаданий и промахов кеша ответов. Для администратора."""
+    permission_classes = (IsRoleAdmin,)
+
+    def get(self, request):
+        return Response(cache.get_stats(
+            ('titles', 'genres', 'categories', 'reviews', 'comments')))
+
+
 class UsersViewSet(viewsets.ModelViewSet):
     """Получение списка пользователей и редактирование."""
     queryset = User.objects.all()
@@ -89,28 +149,47 @@ class UsersViewSet(viewsets.ModelViewSet):
         url_name='current_user_info')
     def get_current_user_info(self, request,):
         """Просмотр и редактирование своего аккаунта."""
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
-            serializer = NotAdminUserSerializer(self.request.user)
+            serializer = NotAdminUserSerializer(user)
         else:
             serializer = NotAdminUserSerializer(
-                self.request.user, data=request.data, partial=True)
+                user, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
             serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(TitleBulkMixin, SparseFieldsMixin, CachedResponseMixin,
+                   viewsets.ModelViewSet):
     """Класс произведения. Доступен администратору."""
     queryset = Title.objects.select_related(
-        'category').prefetch_related('genre').annotate(
-            rating=Avg('reviews__score'))
+        'category').prefetch_related('genre')
     serializer_class = TitleSerializer
+    bulk_serializer_class = BulkTitleSerializer
     permission_classes = (AdminOrReadOnly,)
-    pagination_class = LimitOffsetPagination
-    filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
+    pagination_class = TitlePagination
+    filter_backends = (DjangoFilterBackend, RelevanceOrderingFilter)
     filterset_class = TitleFilter
     filterset_fields = ('name',)
-    ordering_fields = ('name',)
+    ordering_fields = ('name', 'rating', 'year')
+    ordering = ('name', 'id')
+    sparse_fields = {
+        'id': ('id',),
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating',),
+        'review_count': ('review_count',),
+        'description': ('description',),
+        'genre': (),
+        'category': ('category__name', 'category__slug'),
+    }
+    sparse_select_related = {'category': 'category'}
+    sparse_prefetch_related = {'genre': 'genre'}
+    sparse_required = ('id', 'name', 'year')
+
+    def get_queryset(self):
+        return self.get_sparse_queryset(super().get_queryset())
 
     def get_serializer_class(self):
         """
@@ -120,44 +199,201 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitlePostSerialzier
         return TitleSerializer
 
+    def get_cache_scopes(self):
+        if self.action == 'retrieve':
+            return ('catalog', f'title:{self.kwargs.get("pk")}')
+        if self.action == 'score_distribution':
+            return (f'title:{self.kwargs.get("pk")}',)
+        if self.action == 'similar':
+            return (similarity.BUILD_SCOPE,
+                    f'title:{self.kwargs.get("pk")}')
+        if self.action == 'trending':
+            return ('titles', 'trending')
+        return ('titles',)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        if 'ids' in request.query_params:
+            return self.cached_response(self.get_many, request)
+        return super().list(request, *args, **kwargs)
+
+    def get_many(self, request):
+        """
+        Произведения по списку id (?ids=1,2,3) в порядке запроса.
+        Загружаются одним запросом с категориями и одним запросом жанров
+        независимо от количества id; фильтры и пагинация не применяются.
+        Ненайденные id перечисляются в not_found.
+        """
+        try:
+            ids = list(dict.fromkeys(
+                int(pk) for pk in request.query_params['ids'].split(',')
+                if pk.strip()))
+        except ValueError:
+            return Response(
+                {'ids': 'Ожидается список целых чисел через запятую.'},
+                status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > settings.TITLES_MAX_IDS:
+            return Response(
+                {'ids': f'Не более {settings.TITLES_MAX_IDS} id за запрос.'},
+                status=status.HTTP_400_BAD_REQUEST)
+        titles = self.get_queryset().in_bulk(ids)
+        return Response({
+            'results': self.get_serializer(
+                [titles[pk] for pk in ids if pk in titles], many=True).data,
+            'not_found': [pk for pk in ids if pk not in titles],
+        })
+
+    @action(detail=False)
+    def trending(self, request):
+        """
+        Популярные сейчас произведения по убыванию популярности.
+        Читаются по индексу trending_score без агрегации отзывов.
+        """
+        return self.cached_response(self.get_trending, request)
+
+    def get_trending(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 10)),
+                        settings.TRENDING_SIZE)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response({'limit': 'Ожидается положительное целое число.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        titles = self.get_queryset().filter(trending_score__gt=0).order_by(
+            '-trending_score', '-id')[:limit]
+        return Response(TitleSerializer(titles, many=True).data)
+
+    @action(detail=True)
+    def similar(self, request, pk=None):
+        """Похожие произведения, рассчитанные build_similar_titles."""
+        return self.cached_response(self.get_similar, request, pk=pk)
 
-class GenreViewSet(CreateListDestroyViewSet):
+    def get_similar(self, request, pk=None):
+        similar = SimilarTitle.objects.filter(
+            title_id=pk).select_related('similar__category').prefetch_related(
+                'similar__genre')
+        return Response(SimilarTitleSerializer(similar, many=True).data)
+
+    @action(detail=True, url_path='score-distribution')
+    def score_distribution(self, request, pk=None):
+        """Распределение оценок произведения, средняя оценка и медиана."""
+        return self.cached_response(
+            self.get_score_distribution, request, pk=pk)
+
+    def get_score_distribution(self, request, pk=None):
+        distribution = ScoreDistribution.objects.filter(title_id=pk).first()
+        if distribution is None:
+            # Произведение загружено без сигналов и ещё не пересчитано.
+            title = get_object_or_404(Title.objects.only('id'), pk=pk)
+            distribution = ScoreDistribution(title=title)
+        return Response(ScoreDistributionSerializer(distribution).data)
+
+
+class GenreViewSet(GroupBulkMixin, LeaderboardMixin,
+                   CreateListDestroyViewSet):
     """Класс жанра произведения. Доступен администратору."""
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    bulk_serializer_class = BulkGroupSerializer
+    leaderboard_serializer_class = LeaderboardEntrySerializer
+    cache_scopes = ('genres',)
 
 
-class CategoryViewSet(CreateListDestroyViewSet):
+class CategoryViewSet(GroupBulkMixin, LeaderboardMixin,
+                      CreateListDestroyViewSet):
     """Класс категории произведения. Доступен администратору."""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    bulk_serializer_class = BulkGroupSerializer
+    leaderboard_serializer_class = LeaderboardEntrySerializer
+    cache_scopes = ('categories',)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(SparseFieldsMixin, CachedResponseMixin,
+                    viewsets.ModelViewSet):
     """Просмотр и редактирование рецензий."""
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthorModerAdminOrReadOnly,)
+    pagination_class = OptionalCursorPagination
+    sparse_fields = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__id', 'author__username'),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+        'comment_count': ('comment_count',),
+    }
+    sparse_select_related = {'author': 'author'}
+    # title_id читает менеджер title.reviews для каждой строки.
+    sparse_required = ('id', 'pub_date', 'title_id')
 
-    def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+    @cached_property
+    def title(self):
+        """Произведение из url, загружается один раз за запрос."""
+        return get_object_or_404(
+            Title.objects.only('id'), id=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.get_sparse_queryset(
+            self.title.reviews.select_related('author').only(
+                'id', 'text', 'score', 'pub_date', 'title_id',
+                'comment_count', 'author__id', 'author__username'))
+
+    def get_cache_scopes(self):
+        return (f'reviews:{self.kwargs.get("title_id")}',)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        serializer.save(author=self.request.user, title=self.title)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(SparseFieldsMixin, CachedResponseMixin,
+                     viewsets.ModelViewSet):
     """Просмотр и редактирование комментариев."""
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorModerAdminOrReadOnly,)
+    pagination_class = OptionalCursorPagination
+    sparse_fields = {
+        'id': ('id',),
+        'text': ('text',),
+        'pub_date': ('pub_date',),
+        'author': ('author__id', 'author__username'),
+        'review': ('review_id',),
+    }
+    sparse_select_related = {'author': 'author'}
+    # review_id читает менеджер review.comments для каждой строки.
+    sparse_required = ('id', 'pub_date', 'review_id')
 
-    def get_review(self):
-        return get_object_or_404(Review, id=self.kwargs.get('review_id'))
+    @cached_property
+    def review(self):
+        """
+        Отзыв из url, проверяется принадлежность произведению.
+        Загружается одним запросом один раз за запрос.
+        """
+        return get_object_or_404(
+            Review.objects.only('id', 'title_id'),
+            id=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.get_sparse_queryset(
+            self.review.comments.select_related('author').only(
+                'id', 'text', 'pub_date', 'review_id',
+                'author__id', 'author__username'))
+
+    def get_cache_scopes(self):
+        return (f'comments:{self.kwargs.get("review_id")}',)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        serializer.save(author=self.request.user, review=self.review)
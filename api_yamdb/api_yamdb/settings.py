@@ -69,6 +69,41 @@ DATABASES = {
 }
 
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'api_yamdb'),
+    }
+}
+
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+
+AUTOCOMPLETE_MAX_LIMIT = 50
+# Как часто (в секундах) индекс автодополнения сверяет версии данных
+# в БД и перестраивается после изменений в других процессах.
+AUTOCOMPLETE_CHECK_INTERVAL = 5
+
+LEADERBOARD_SIZE = 20
+LEADERBOARD_MIN_REVIEWS = 3
+LEADERBOARD_PRIOR_COUNT = 3
+
+TRENDING_HALF_LIFE = 24
+TRENDING_REVIEW_WEIGHT = 3
+TRENDING_COMMENT_WEIGHT = 1
+TRENDING_MIN_SCORE = 0.01
+TRENDING_SIZE = 50
+
+BULK_MAX_ITEMS = 1000
+
+TITLES_MAX_IDS = 200
+
+SIMILAR_TITLES_COUNT = 10
+SIMILAR_GENRE_WEIGHT = 1
+SIMILAR_REVIEWER_WEIGHT = 1
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -105,7 +140,7 @@ EMPTY = '-'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -121,12 +156,20 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+# Сколько секунд кешировать ревизию токенов и активность пользователя.
+USER_STATE_CACHE_TIMEOUT = 30
 
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 EMAIL_HOST = 'localhost'
 ADMIN_EMAIL = 'admin@api_yamdb.com'
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+# Через сколько секунд письмо, взятое упавшим обработчиком, вернётся
+# в очередь.
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 300
 
 LIMIT_NAME = 256
 LIMIT_SLUG = 50
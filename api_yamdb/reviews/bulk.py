@@ -0,0 +1,72 @@
+from django.db import connection
+from django.dispatch import Signal
+
+from .genre_masks import get_mask
+from .models import GenreTitle, Title
+
+# Отправляется после bulk_create/bulk_update, которые не вызывают
+# post_save: sender — модель, instances — сохранённые объекты,
+# created — созданы ли объекты, fields — изменённые поля.
+bulk_saved = Signal()
+
+
+def create_groups(model, groups):
+    """
+    Создаёт жанры или категории одним INSERT.
+    Если БД не возвращает id, они загружаются по slug.
+    """
+    model.objects.bulk_create(groups)
+    if any(group.pk is None for group in groups):
+        ids = dict(model.objects.filter(
+            slug__in=[group.slug for group in groups]
+        ).values_list('slug', 'id'))
+        for group in groups:
+            group.pk = ids[group.slug]
+    bulk_saved.send(
+        sender=model, instances=groups, created=True, fields=None)
+
+
+def update_groups(model, groups):
+    model.objects.bulk_update(groups, ('name',))
+    bulk_saved.send(
+        sender=model, instances=groups, created=False, fields=('name',))
+
+
+def create_titles(titles):
+    """
+    Создаёт произведения со связями с жанрами.
+    titles — список пар (произведение, жанры). Маска жанров заполняется
+    до записи. Если БД возвращает id из bulk_create, произведения
+    создаются одним INSERT, иначе сохраняются по одному, чтобы получить
+    id для связей; связи создаются одним INSERT.
+    """
+    for title, genres in titles:
+        title.genre_mask = get_mask(
+            genre.bit for genre in genres if genre.bit is not None)
+    instances = [title for title, _ in titles]
+    if connection.features.can_return_ids_from_bulk_insert:
+        Title.objects.bulk_create(instances)
+        bulk_saved.send(
+            sender=Title, instances=instances, created=True, fields=None)
+    else:
+        for title in instances:
+            title.save()
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title=title, genre=genre)
+        for title, genres in titles for genre in genres)
+
+
+def update_titles(titles, fields):
+    """
+    Обновляет поля произведений одним bulk_update.
+    titles — список пар (произведение, жанры или None); жанры
+    заменяются через RelatedManager.set() с сигналами m2m_changed.
+    """
+    instances = [title for title, _ in titles]
+    if fields:
+        Title.objects.bulk_update(instances, fields)
+        bulk_saved.send(
+            sender=Title, instances=instances, created=False, fields=fields)
+    for title, genres in titles:
+        if genres is not None:
+            title.genre.set(genres)
@@ -0,0 +1,72 @@
+import csv
+import json
+
+from .models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+TABLES = {
+    User: 'users.csv',
+    Category: 'category.csv',
+    Genre: 'genre.csv',
+    Title: 'titles.csv',
+    GenreTitle: 'genre_title.csv',
+    Review: 'review.csv',
+    Comment: 'comments.csv',
+}
+
+COLUMNS = {
+    User: ('id', 'username', 'email', 'role', 'bio', 'first_name',
+           'last_name'),
+    Category: ('id', 'name', 'slug'),
+    Genre: ('id', 'name', 'slug'),
+    Title: ('id', 'name', 'year', 'category', 'description'),
+    GenreTitle: ('id', 'title_id', 'genre_id'),
+    Review: ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    Comment: ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """Буфер, возвращающий записанную строку вместо её хранения."""
+
+    def write(self, value):
+        return value
+
+
+def get_table(name):
+    """Модель по имени csv-файла без расширения."""
+    for model, csv_file in TABLES.items():
+        if csv_file.rsplit('.', 1)[0] == name:
+            return model
+    return None
+
+
+def iter_rows(model, chunk_size=2000):
+    """
+    Строки таблицы в формате csv-файлов load_test_data.
+    Объекты читаются порциями, память не растёт с размером таблицы.
+    """
+    columns = COLUMNS[model]
+    attnames = [model._meta.get_field(column).attname for column in columns]
+    rows = model.objects.order_by('id').values_list(*attnames).iterator(
+        chunk_size=chunk_size)
+    for row in rows:
+        yield dict(zip(columns, row))
+
+
+def iter_lines(model, export_format='csv', chunk_size=2000):
+    """Строки таблицы в виде csv или ndjson."""
+    if export_format == 'ndjson':
+        for row in iter_rows(model, chunk_size):
+            yield json.dumps(row, ensure_ascii=False, default=str) + '\n'
+        return
+    writer = csv.writer(Echo())
+    yield writer.writerow(COLUMNS[model])
+    for row in iter_rows(model, chunk_size):
+        yield writer.writerow(
+            '' if value is None else value for value in row.values())
@@ -0,0 +1,63 @@
+from collections import defaultdict
+
+from .models import Genre, GenreTitle, Title
+
+# Знаковый BIGINT: биты 0..62.
+GENRE_MASK_BITS = 63
+
+
+def get_mask(bits):
+    """Битовая маска из номеров битов жанров."""
+    mask = 0
+    for bit in bits:
+        mask |= 1 << bit
+    return mask
+
+
+def get_free_bit():
+    """Наименьший незанятый бит или None, если все биты заняты."""
+    used = set(Genre.objects.exclude(
+        bit=None).values_list('bit', flat=True))
+    for bit in range(GENRE_MASK_BITS):
+        if bit not in used:
+            return bit
+    return None
+
+
+def assign_bits():
+    """Назначает биты жанрам без бита, например после bulk_create."""
+    for genre in Genre.objects.filter(bit=None).order_by('id'):
+        bit = get_free_bit()
+        if bit is None:
+            break
+        Genre.objects.filter(pk=genre.pk).update(bit=bit)
+
+
+def get_genre_bits(slugs):
+    """Словарь slug -> бит для существующих жанров."""
+    return dict(Genre.objects.filter(
+        slug__in=slugs).values_list('slug', 'bit'))
+
+
+def update_genre_masks(title_ids=None):
+    """
+    Пересчитывает маски жанров по строкам GenreTitle.
+    Без title_ids пересчитываются все произведения.
+    Возвращает количество изменённых произведений.
+    """
+    titles = Title.objects.all()
+    links = GenreTitle.objects.exclude(genre__bit=None)
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+        links = links.filter(title_id__in=title_ids)
+    masks = defaultdict(int)
+    for title_id, bit in links.values_list('title_id', 'genre__bit'):
+        masks[title_id] |= 1 << bit
+    changed = [
+        title for title in titles.only('id', 'genre_mask')
+        if title.genre_mask != masks[title.id]
+    ]
+    for title in changed:
+        title.genre_mask = masks[title.id]
+    Title.objects.bulk_update(changed, ('genre_mask',), batch_size=500)
+    return len(changed)
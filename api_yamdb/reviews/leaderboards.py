@@ -0,0 +1,196 @@
+import threading
+
+from django.conf import settings
+from django.db.models import (Exists, ExpressionWrapper, F, FloatField,
+                              OuterRef, Sum, Value)
+
+from .models import (Category, Genre, GenreTitle, LeaderboardEntry,
+                     ScoreTotals, Title)
+
+# Произведения, удаляемые в текущем потоке: каскадное удаление их отзывов
+# не должно снова добавлять их в рейтинги.
+_deleting = threading.local()
+
+
+def get_deleting():
+    if not hasattr(_deleting, 'titles'):
+        _deleting.titles = {}
+    return _deleting.titles
+
+
+def start_delete(title_id):
+    """Запоминает рейтинги удаляемого произведения."""
+    get_deleting()[title_id] = get_listed_boards(title_id)
+
+
+def finish_delete(title_id):
+    """Пересчитывает рейтинги, из которых выбыло удалённое произведение."""
+    boards = get_deleting().pop(title_id, set())
+    if boards:
+        mean = get_mean()
+        for board in boards:
+            store(board, rank(board, mean))
+
+
+def rebuild_totals():
+    """Пересчитывает итоги оценок по сохранённым суммам произведений."""
+    totals = Title.objects.aggregate(
+        score_sum=Sum('score_sum'), review_count=Sum('review_count'))
+    totals = {field: value or 0 for field, value in totals.items()}
+    ScoreTotals.objects.update_or_create(pk=ScoreTotals.PK, defaults=totals)
+    return totals
+
+
+def shift_totals(score_delta, count_delta):
+    """Изменяет итоги оценок одним UPDATE; без строки итогов — пересчёт."""
+    if not ScoreTotals.objects.filter(pk=ScoreTotals.PK).update(
+            score_sum=F('score_sum') + score_delta,
+            review_count=F('review_count') + count_delta):
+        rebuild_totals()
+
+
+def get_mean():
+    """Средняя оценка по всем произведениям из итогов оценок."""
+    totals = ScoreTotals.objects.filter(pk=ScoreTotals.PK).values(
+        'score_sum', 'review_count').first() or rebuild_totals()
+    if not totals['review_count']:
+        return 0.0
+    return totals['score_sum'] / totals['review_count']
+
+
+def get_weighted_rating(score_sum, review_count, mean):
+    """
+    Байесовский рейтинг: средняя оценка с LEADERBOARD_PRIOR_COUNT
+    дополнительными оценками, равными средней по всем произведениям.
+    """
+    prior = settings.LEADERBOARD_PRIOR_COUNT
+    return (prior * mean + score_sum) / (prior + review_count)
+
+
+def get_titles(board):
+    """Произведения группы ('genre' или 'category', id)."""
+    field, group_id = board
+    if field == 'genre':
+        return Title.objects.filter(id__in=GenreTitle.objects.filter(
+            genre_id=group_id).values('title_id'))
+    return Title.objects.filter(category_id=group_id)
+
+
+def rank(board, mean):
+    """
+    Первые LEADERBOARD_SIZE произведений группы не менее чем
+    с LEADERBOARD_MIN_REVIEWS отзывами: список (title_id, рейтинг).
+    """
+    prior = settings.LEADERBOARD_PRIOR_COUNT
+    weighted = ExpressionWrapper(
+        (Value(prior * mean, output_field=FloatField()) + F('score_sum'))
+        / (prior + F('review_count')),
+        output_field=FloatField())
+    return list(get_titles(board).filter(
+        review_count__gte=settings.LEADERBOARD_MIN_REVIEWS,
+    ).annotate(weighted=weighted).order_by(
+        '-weighted', 'id'
+    ).values_list('id', 'weighted')[:settings.LEADERBOARD_SIZE])
+
+
+def get_entries(board):
+    field, group_id = board
+    return LeaderboardEntry.objects.filter(**{f'{field}_id': group_id})
+
+
+def store(board, ranked):
+    """Перезаписывает рейтинг группы."""
+    field, group_id = board
+    get_entries(board).delete()
+    LeaderboardEntry.objects.bulk_create(
+        LeaderboardEntry(
+            title_id=title_id, position=position, weighted_rating=rating,
+            **{f'{field}_id': group_id})
+        for position, (title_id, rating) in enumerate(ranked, start=1))
+
+
+def get_listed_boards(title_id):
+    """Рейтинги, в которых сейчас находится произведение."""
+    return {
+        ('genre', genre_id) if genre_id else ('category', category_id)
+        for genre_id, category_id in LeaderboardEntry.objects.filter(
+            title_id=title_id).values_list('genre_id', 'category_id')
+    }
+
+
+def merge(board, title_id, rating):
+    """
+    Вставляет новый рейтинг произведения в сохранённый список группы.
+    Если произведение опустилось ниже последнего места полного списка
+    или выбыло из рейтинга, его место может занять произведение не из
+    списка, и группа пересчитывается целиком.
+    """
+    entries = list(get_entries(board).order_by('position').values_list(
+        'title_id', 'weighted_rating'))
+    listed = any(entry[0] == title_id for entry in entries)
+    full = len(entries) >= settings.LEADERBOARD_SIZE
+    if listed and full and (rating is None or rating < entries[-1][1]):
+        store(board, rank(board, get_mean()))
+        return
+    ranked = [entry for entry in entries if entry[0] != title_id]
+    if rating is not None:
+        ranked.append((title_id, rating))
+    ranked = sorted(ranked, key=lambda entry: (-entry[1], entry[0]))[
+        :settings.LEADERBOARD_SIZE]
+    if ranked != entries:
+        store(board, ranked)
+
+
+def refresh_title(title_id, boards=()):
+    """
+    Обновляет рейтинги групп произведения после изменения его отзывов,
+    жанров или категории. boards — группы, из которых произведение
+    могло выбыть.
+    """
+    if title_id in get_deleting():
+        return
+    title = Title.objects.filter(pk=title_id).annotate(
+        listed=Exists(LeaderboardEntry.objects.filter(title_id=OuterRef('pk')))
+    ).values('score_sum', 'review_count', 'category_id', 'listed').first()
+    qualifies = (
+        title is not None
+        and title['review_count'] >= settings.LEADERBOARD_MIN_REVIEWS)
+    if not qualifies and not boards and not (title and title['listed']):
+        return
+    listed = get_listed_boards(title_id) | set(boards)
+    current = set()
+    if title is not None:
+        current = {
+            ('genre', genre_id) for genre_id in GenreTitle.objects.filter(
+                title_id=title_id).values_list('genre_id', flat=True)}
+        if title['category_id']:
+            current.add(('category', title['category_id']))
+    mean = get_mean()
+    for board in listed - current:
+        store(board, rank(board, mean))
+    rating = get_weighted_rating(
+        title['score_sum'], title['review_count'], mean
+    ) if qualifies else None
+    for board in current:
+        merge(board, title_id, rating)
+
+
+def get_boards():
+    """Все группы: жанры и категории."""
+    return (
+        [('genre', pk) for pk in Genre.objects.values_list('id', flat=True)]
+        + [('category', pk)
+           for pk in Category.objects.values_list('id', flat=True)])
+
+
+def rebuild():
+    """
+    Пересчитывает итоги оценок и все рейтинги.
+    Возвращает количество групп.
+    """
+    rebuild_totals()
+    mean = get_mean()
+    boards = get_boards()
+    for board in boards:
+        store(board, rank(board, mean))
+    return len(boards)
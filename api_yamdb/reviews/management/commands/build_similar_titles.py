@@ -0,0 +1,73 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import connections, transaction
+
+from reviews import similarity
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    """
+    Расчёт похожих произведений по жанрам и общим авторам отзывов.
+    Произведения обрабатываются порциями, при --workers > 1 порции
+    считаются в отдельных процессах, а записываются в основном.
+    """
+
+    help = 'Пересчитывает похожие произведения для всех произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k', type=int, default=settings.SIMILAR_TITLES_COUNT,
+            help='Количество похожих произведений для каждого произведения.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Количество произведений в одной порции.')
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Количество процессов для расчёта.')
+
+    def get_chunks(self, chunk_size):
+        title_ids = list(
+            Title.objects.order_by('id').values_list('id', flat=True))
+        return [title_ids[start:start + chunk_size]
+                for start in range(0, len(title_ids), chunk_size)]
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        state = (
+            similarity.load_vectors(),
+            {'genre': settings.SIMILAR_GENRE_WEIGHT,
+             'reviewer': settings.SIMILAR_REVIEWER_WEIGHT},
+            options['top_k'],
+        )
+        chunks = self.get_chunks(max(options['chunk_size'], 1))
+        if options['workers'] > 1:
+            # Дочерние процессы не работают с БД и не должны
+            # наследовать открытые соединения.
+            connections.close_all()
+            with ProcessPoolExecutor(
+                    max_workers=options['workers'],
+                    initializer=similarity.init_worker,
+                    initargs=state) as executor:
+                results = executor.map(similarity.compute_chunk, chunks)
+                processed = self.store(results)
+        else:
+            similarity.init_worker(*state)
+            processed = self.store(
+                similarity.compute_chunk(chunk) for chunk in chunks)
+        similarity.finish_build(self.__class__)
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Похожие произведения рассчитаны для {processed} '
+                f'произведений за {time.monotonic() - started:.1f} с'))
+
+    def store(self, results):
+        processed = 0
+        for result in results:
+            with transaction.atomic():
+                similarity.store(result)
+            processed += len(result)
+        return processed
@@ -0,0 +1,34 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from reviews import trending
+
+
+class Command(BaseCommand):
+    """Затухание популярности произведений."""
+
+    help = ('Уменьшает популярность произведений за прошедшее время. '
+            'Запускается периодически, например из cron.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=float, default=1,
+            help='Время в часах для первого запуска; дальше время '
+                 'считается от прошлого затухания, сохранённого в БД.')
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Пересчитать популярность по датам отзывов и комментариев.')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            changed = trending.rebuild()
+            message = f'Пересчитана популярность произведений: {changed}'
+        else:
+            hours, cleared = trending.decay(options['hours'])
+            message = (
+                f'Популярность уменьшена в '
+                f'{1 / trending.get_factor(hours):.3f} раза, '
+                f'обнулено произведений: {cleared}')
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,35 @@
+import os
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from reviews.datasets import EXPORT_FORMATS, TABLES, iter_lines
+
+
+class Command(BaseCommand):
+    """Выгрузка данных в файлы в формате load_test_data."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', dest='export_format', choices=EXPORT_FORMATS,
+            default='csv', help='Формат файлов выгрузки.')
+        parser.add_argument(
+            '--path', default=f'{settings.BASE_DIR}/export',
+            help='Папка для файлов выгрузки.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Количество записей, читаемых из БД за раз.')
+
+    def handle(self, *args, **options):
+        os.makedirs(options['path'], exist_ok=True)
+        for model, csv_file in TABLES.items():
+            name = f'{csv_file.rsplit(".", 1)[0]}.{options["export_format"]}'
+            counter = -1 if options['export_format'] == 'csv' else 0
+            with open(os.path.join(options['path'], name), 'w',
+                      encoding='utf-8', newline='') as file:
+                for line in iter_lines(model, options['export_format'],
+                                       options['chunk_size']):
+                    file.write(line)
+                    counter += 1
+            self.stdout.write(self.style.SUCCESS(
+                f'Выгружено {counter} записей в файл {name}'))
@@ -1,52 +1,207 @@
-from collections import OrderedDict
-
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from csv import DictReader
 
 from django.conf import settings
-from django.core.management import BaseCommand
-
-from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
-from users.models import User
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import connection, connections, transaction
 
-TABLES = {
-    User: 'users.csv',
-    Category: 'category.csv',
-    Genre: 'genre.csv',
-    Title: 'titles.csv',
-    GenreTitle: 'genre_title.csv',
-    Review: 'review.csv',
-    Comment: 'comments.csv',
-}
+from reviews import versions
+from reviews.datasets import TABLES
 
 
 class Command(BaseCommand):
-    """Импорт тестовых данных из csv-файлов."""
+    """
+    Импорт тестовых данных из csv-файлов.
+    Независимые таблицы загружаются параллельно, порядок определяется
+    внешними ключами моделей.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество записей в одном INSERT.')
+        parser.add_argument(
+            '--path', default=f'{settings.BASE_DIR}/static/data',
+            help='Папка с csv-файлами.')
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Количество таблиц, загружаемых одновременно.')
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с загруженными таблицами для продолжения импорта.')
+
+    def get_dependencies(self):
+        """Таблицы, на которые ссылаются внешние ключи каждой модели."""
+        return {
+            model: {
+                field.related_model
+                for field in model._meta.concrete_fields
+                if field.is_relation and field.related_model in TABLES
+                and field.related_model is not model
+            }
+            for model in TABLES
+        }
+
+    def read_checkpoint(self, path):
+        if path is None or not os.path.exists(path):
+            return set()
+        with open(path, encoding='utf-8') as file:
+            return set(json.load(file))
+
+    def write_checkpoint(self, path, done):
+        if path is None:
+            return
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+            json.dump(sorted(done), file)
+        os.replace(f'{path}.tmp', path)
+
+    def get_ids(self, model):
+        """Множество id записей таблицы, загружается один раз."""
+        if model not in self.ids:
+            self.ids[model] = set(
+                model.objects.values_list('id', flat=True).iterator())
+        return self.ids[model]
+
+    def get_columns(self, model, header):
+        """Поле модели и связанная модель для каждой колонки csv."""
+        columns = []
+        for column in header:
+            field = model._meta.get_field(column)
+            related = field.related_model if field.is_relation else None
+            columns.append((column, field.attname, related))
+        return columns
+
+    def build(self, model, columns, row):
+        """Объект модели или None, если внешний ключ не найден."""
+        values = {}
+        for column, attname, related in columns:
+            value = row[column]
+            if related is not None:
+                value = int(value) if value else None
+                if value is not None and value not in self.get_ids(related):
+                    return None
+            values[attname] = value
+        values['id'] = int(values['id'])
+        return model(**values)
+
+    def get_auto_dates(self, model, columns):
+        """
+        Колонки csv с полями auto_now_add и auto_now: bulk_create
+        заменяет их значения текущим временем.
+        """
+        fields = [model._meta.get_field(column) for column, _, _ in columns]
+        return [
+            field.attname for field in fields
+            if getattr(field, 'auto_now_add', False)
+            or getattr(field, 'auto_now', False)
+        ]
+
+    def save(self, model, batch, auto_dates):
+        """Сохраняет пачку и восстанавливает даты из csv."""
+        dates = [[getattr(obj, attname) for attname in auto_dates]
+                 for obj in batch]
+        model.objects.bulk_create(batch)
+        restored = []
+        for obj, values in zip(batch, dates):
+            if all(values):
+                for attname, value in zip(auto_dates, values):
+                    setattr(obj, attname, value)
+                restored.append(obj)
+        if auto_dates and restored:
+            model.objects.bulk_update(restored, auto_dates)
+        return len(batch)
+
+    @transaction.atomic
+    def load(self, model, csv_file, batch_size):
+        existing = self.get_ids(model)
+        loaded = skipped = 0
+        with open(csv_file, encoding='utf-8') as file:
+            reader = DictReader(file)
+            columns = self.get_columns(model, reader.fieldnames)
+            auto_dates = self.get_auto_dates(model, columns)
+            batch = []
+            for row in reader:
+                if int(row['id']) in existing:
+                    continue
+                obj = self.build(model, columns, row)
+                if obj is None:
+                    skipped += 1
+                    continue
+                batch.append(obj)
+                existing.add(obj.id)
+                if len(batch) >= batch_size:
+                    loaded += self.save(model, batch, auto_dates)
+                    batch = []
+            loaded += self.save(model, batch, auto_dates)
+        return loaded, skipped
+
+    def run(self, model, options):
+        """Загрузка одной таблицы в отдельном потоке."""
+        try:
+            started = time.monotonic()
+            loaded, skipped = self.load(
+                model, f'{options["path"]}/{TABLES[model]}',
+                options['batch_size'])
+            return loaded, skipped, time.monotonic() - started
+        finally:
+            connections.close_all()
+
+    def report(self, model, loaded, skipped, duration):
+        self.stdout.write(
+            f'Импорт данных из файла {TABLES[model]}\n'
+            + self.style.SUCCESS(
+                f'- загружено {loaded} записей, '
+                f'{loaded / duration if duration else loaded:.0f} записей/с'))
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f'- пропущено {skipped} записей без связанных объектов'))
 
     def handle(self, *args, **options):
-        for model, csv_file in TABLES.items():
-            self.stdout.write(f'Импорт данных из файла {csv_file}')
-            with open(f'{settings.BASE_DIR}/static/data/{csv_file}',
-                      encoding='utf-8') as file:
-                counter = 0
-                for row in DictReader(file):
-                    if not model.objects.filter(id=row['id']).exists():
-                        correct_row = []
-                        for key, value in row.items():
-                            if key == 'category':
-                                continue
-                                correct_row.append(
-                                    (key,
-                                     Category.objects.filter(id=value).first()
-                                     )
-                                )
-                            if key == 'author':
-                                correct_row.append((
-                                    key,
-                                    User.objects.filter(id=value).first()
-                                ))
-                            else:
-                                correct_row.append((key, value))
-                        model.objects.get_or_create(**OrderedDict(correct_row))
-                        counter += 1
-                    self.stdout.write(self.style.SUCCESS(
-                        f'- загружено {counter} записей'))
+        self.ids = {}
+        workers = options['workers']
+        if connection.vendor == 'sqlite' and workers > 1:
+            # SQLite допускает только одну пишущую транзакцию.
+            self.stdout.write(self.style.WARNING(
+                'SQLite: таблицы загружаются последовательно'))
+            workers = 1
+        dependencies = self.get_dependencies()
+        done = {model for model in TABLES
+                if TABLES[model] in self.read_checkpoint(
+                    options['checkpoint'])}
+        pending = [model for model in TABLES if model not in done]
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            while pending or running:
+                for model in [model for model in pending
+                              if dependencies[model] <= done]:
+                    pending.remove(model)
+                    running[executor.submit(self.run, model, options)] = (
+                        model)
+                if not running:
+                    raise CommandError('Циклическая зависимость таблиц')
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    model = running.pop(future)
+                    self.report(model, *future.result())
+                    done.add(model)
+                    self.write_checkpoint(
+                        options['checkpoint'],
+                        {TABLES[model] for model in done})
+        if options['checkpoint'] and os.path.exists(options['checkpoint']):
+            os.remove(options['checkpoint'])
+        # bulk_create не отправляет сигналы, пересчитываем рейтинги,
+        # распределения оценок, счётчики, маски жанров, рейтинги жанров
+        # и категорий, поисковый индекс и похожие произведения.
+        call_command('rebuild_ratings', verbosity=0, stdout=self.stdout)
+        call_command(
+            'rebuild_score_distributions', verbosity=0, stdout=self.stdout)
+        call_command(
+            'rebuild_comment_counts', verbosity=0, stdout=self.stdout)
+        call_command('rebuild_genre_masks', verbosity=0, stdout=self.stdout)
+        call_command('rebuild_leaderboards', verbosity=0, stdout=self.stdout)
+        call_command('rebuild_search_index', verbosity=0, stdout=self.stdout)
+        call_command('build_similar_titles', verbosity=0, stdout=self.stdout)
+        versions.bump(versions.ALL)
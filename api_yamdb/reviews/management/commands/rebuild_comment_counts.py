@@ -0,0 +1,39 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from reviews import versions
+from reviews.models import Review
+
+
+class Command(BaseCommand):
+    """Пересчёт сохранённого количества комментариев к отзывам."""
+
+    help = ('Пересчитывает количество комментариев к отзывам '
+            'и сообщает о расхождениях с сохранёнными значениями.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только сообщить о расхождениях, не исправляя их.')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        drifted = []
+        reviews = Review.objects.annotate(amount=Count('comments')).only(
+            'id', 'comment_count')
+        for review in reviews.iterator():
+            if review.comment_count == review.amount:
+                continue
+            if options['verbosity']:
+                self.stdout.write(self.style.WARNING(
+                    f'- отзыв {review.pk}: комментариев '
+                    f'{review.comment_count} -> {review.amount}'))
+            review.comment_count = review.amount
+            drifted.append(review)
+        if drifted and not options['check']:
+            Review.objects.bulk_update(drifted, ('comment_count',))
+            versions.bump(versions.ALL)
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Расхождений найдено: {len(drifted)}'))
@@ -0,0 +1,21 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from reviews import versions
+from reviews.genre_masks import assign_bits, update_genre_masks
+
+
+class Command(BaseCommand):
+    """Пересчёт масок жанров произведений."""
+
+    help = 'Назначает биты жанрам и пересчитывает маски жанров произведений.'
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        assign_bits()
+        changed = update_genre_masks()
+        if changed:
+            versions.bump(versions.ALL)
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Обновлено масок жанров: {changed}'))
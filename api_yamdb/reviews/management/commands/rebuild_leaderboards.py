@@ -0,0 +1,19 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from reviews import leaderboards, versions
+
+
+class Command(BaseCommand):
+    """Пересчёт рейтингов лучших произведений жанров и категорий."""
+
+    help = ('Пересчитывает рейтинги лучших произведений жанров и категорий '
+            'с текущей средней оценкой.')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        boards = leaderboards.rebuild()
+        versions.bump(versions.ALL)
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Пересчитано рейтингов: {boards}'))
@@ -0,0 +1,48 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from reviews import leaderboards, versions
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    """Пересчёт сохранённых рейтингов произведений по всем отзывам."""
+
+    help = ('Пересчитывает сумму оценок, количество отзывов и рейтинг '
+            'произведений и сообщает о расхождениях с сохранёнными '
+            'значениями.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только сообщить о расхождениях, не исправляя их.')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        drifted = []
+        titles = Title.objects.annotate(
+            total=Sum('reviews__score'), amount=Count('reviews'))
+        for title in titles.iterator():
+            score_sum = title.total or 0
+            rating = score_sum / title.amount if title.amount else None
+            if (title.score_sum, title.review_count, title.rating) == (
+                    score_sum, title.amount, rating):
+                continue
+            if options['verbosity']:
+                self.stdout.write(self.style.WARNING(
+                    f'- {title.pk} «{title}»: сумма {title.score_sum} -> '
+                    f'{score_sum}, отзывов {title.review_count} -> '
+                    f'{title.amount}'))
+            title.score_sum = score_sum
+            title.review_count = title.amount
+            title.rating = rating
+            drifted.append(title)
+        if drifted and not options['check']:
+            Title.objects.bulk_update(
+                drifted, ('score_sum', 'review_count', 'rating'))
+            leaderboards.rebuild_totals()
+            versions.bump(versions.ALL)
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Расхождений найдено: {len(drifted)}'))
@@ -0,0 +1,58 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from reviews import versions
+from reviews.models import SCORES, Review, ScoreDistribution, Title
+
+
+class Command(BaseCommand):
+    """Пересчёт распределений оценок произведений по всем отзывам."""
+
+    help = ('Пересчитывает распределения оценок произведений '
+            'и сообщает о расхождениях с сохранёнными значениями.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только сообщить о расхождениях, не исправляя их.')
+
+    def get_counts(self):
+        """Количество отзывов с каждой оценкой по произведениям."""
+        counts = {}
+        for title_id, score, amount in Review.objects.order_by(
+        ).values_list('title_id', 'score').annotate(amount=Count('id')):
+            counts.setdefault(title_id, {})[score] = amount
+        return counts
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        counts = self.get_counts()
+        stored = ScoreDistribution.objects.in_bulk()
+        missing = []
+        drifted = []
+        for title_id in Title.objects.values_list('id', flat=True).iterator():
+            expected = {
+                score: counts.get(title_id, {}).get(score, 0)
+                for score in SCORES}
+            distribution = stored.get(title_id)
+            if distribution is None:
+                distribution = ScoreDistribution(title_id=title_id)
+                missing.append(distribution)
+            elif distribution.counts == expected:
+                continue
+            else:
+                drifted.append(distribution)
+            if options['verbosity']:
+                self.stdout.write(self.style.WARNING(
+                    f'- {title_id}: {distribution.counts} -> {expected}'))
+            for score, amount in expected.items():
+                setattr(distribution, distribution.field_name(score), amount)
+        if (missing or drifted) and not options['check']:
+            ScoreDistribution.objects.bulk_create(missing)
+            ScoreDistribution.objects.bulk_update(drifted, [
+                ScoreDistribution.field_name(score) for score in SCORES])
+            versions.bump(versions.ALL)
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Расхождений найдено: {len(missing) + len(drifted)}'))
@@ -0,0 +1,19 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from reviews import versions
+from reviews.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """Перестроение поискового индекса произведений."""
+
+    help = 'Перестраивает поисковый индекс названий и описаний произведений.'
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        indexed = get_search_backend().rebuild()
+        versions.bump(versions.ALL)
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Проиндексировано произведений: {indexed}'))
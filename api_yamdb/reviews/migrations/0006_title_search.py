@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:18
+
+from django.db import migrations
+
+FTS_TABLE = 'reviews_title_search'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+        'USING fts5(name, description)')
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+        'SELECT id, name, description FROM reviews_title')
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
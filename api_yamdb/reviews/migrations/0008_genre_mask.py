@@ -0,0 +1,41 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:23
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def fill_genre_mask(apps, schema_editor):
+    Genre = apps.get_model('reviews', 'Genre')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    Title = apps.get_model('reviews', 'Title')
+    for bit, genre in enumerate(Genre.objects.order_by('id')[:63]):
+        genre.bit = bit
+        genre.save(update_fields=('bit',))
+    masks = defaultdict(int)
+    for title_id, bit in GenreTitle.objects.exclude(
+            genre__bit=None).values_list('title_id', 'genre__bit'):
+        masks[title_id] |= 1 << bit
+    for title_id, mask in masks.items():
+        Title.objects.filter(pk=title_id).update(genre_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_genre_title_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='genre',
+            name='bit',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, unique=True, verbose_name='Бит в маске жанров'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='genre_mask',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Маска жанров'),
+        ),
+        migrations.RunPython(fill_genre_mask, migrations.RunPython.noop),
+    ]
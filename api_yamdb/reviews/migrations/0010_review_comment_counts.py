@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:41
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_comment_count(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    for review in Review.objects.annotate(amount=Count('comments')).filter(
+            amount__gt=0):
+        review.comment_count = review.amount
+        review.save(update_fields=('comment_count',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='title',
+            old_name='score_count',
+            new_name='review_count',
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
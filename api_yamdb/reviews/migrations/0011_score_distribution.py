@@ -0,0 +1,50 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def fill_score_distribution(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    ScoreDistribution = apps.get_model('reviews', 'ScoreDistribution')
+    Title = apps.get_model('reviews', 'Title')
+    counts = {}
+    for title_id, score, amount in Review.objects.order_by().values_list(
+            'title_id', 'score').annotate(amount=Count('id')):
+        counts.setdefault(title_id, {})[f'score_{score}'] = amount
+    ScoreDistribution.objects.bulk_create(
+        ScoreDistribution(title_id=title_id, **counts.get(title_id, {}))
+        for title_id in Title.objects.values_list('id', flat=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_review_comment_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreDistribution',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score_distribution', serialize=False, to='reviews.Title', verbose_name='Произведение')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='Оценка 1')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='Оценка 2')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='Оценка 3')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='Оценка 4')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='Оценка 5')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='Оценка 6')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='Оценка 7')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='Оценка 8')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='Оценка 9')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='Оценка 10')),
+            ],
+            options={
+                'verbose_name': 'Распределение оценок',
+                'verbose_name_plural': 'Распределения оценок',
+            },
+        ),
+        migrations.RunPython(
+            fill_score_distribution, migrations.RunPython.noop),
+    ]
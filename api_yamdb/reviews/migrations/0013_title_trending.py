@@ -0,0 +1,22 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_leaderboard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False, verbose_name='Популярность'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['trending_score', 'id'], name='title_trending_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:57
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def fill_score_totals(apps, schema_editor):
+    ScoreTotals = apps.get_model('reviews', 'ScoreTotals')
+    Title = apps.get_model('reviews', 'Title')
+    totals = Title.objects.aggregate(
+        score_sum=Sum('score_sum'), review_count=Sum('review_count'))
+    ScoreTotals.objects.create(
+        pk=1, score_sum=totals['score_sum'] or 0,
+        review_count=totals['review_count'] or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0015_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreTotals',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score_sum', models.BigIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+            ],
+            options={
+                'verbose_name': 'Итоги оценок',
+                'verbose_name_plural': 'Итоги оценок',
+            },
+        ),
+        migrations.RunPython(fill_score_totals, migrations.RunPython.noop),
+    ]
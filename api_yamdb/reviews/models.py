@@ -21,6 +21,10 @@ class GenreCategoryAbstractModel(models.Model):
 
 class Genre(GenreCategoryAbstractModel):
     """Жанр произведения."""
+    bit = models.PositiveSmallIntegerField(
+        'Бит в маске жанров', unique=True, null=True, blank=True,
+        editable=False)
+
     class Meta(GenreCategoryAbstractModel.Meta):
         verbose_name = 'Жанр'
         verbose_name_plural = 'Жанры'
@@ -35,8 +39,29 @@ class Category(GenreCategoryAbstractModel):
         default_related_name = "categories"
 
 
-class Title(models.Model):
+class CounterFieldsMixin:
+    """
+    Поля из counter_fields обновляются только F()-выражениями в сигналах,
+    поэтому save() существующего объекта их не перезаписывает.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class Title(CounterFieldsMixin, models.Model):
     """Произведение."""
+    counter_fields = (
+        'score_sum', 'review_count', 'rating', 'genre_mask', 'trending_score')
+
     name = models.CharField(
         'Название произведения',
         max_length=settings.LIMIT_NAME)
@@ -62,25 +87,231 @@ class Title(models.Model):
         null=True,
         verbose_name='Категория произведения'
     )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False)
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов', default=0, editable=False)
+    rating = models.FloatField(
+        'Рейтинг', null=True, blank=True, editable=False)
+    genre_mask = models.BigIntegerField(
+        'Маска жанров', default=0, editable=False)
+    trending_score = models.FloatField(
+        'Популярность', default=0, editable=False)
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('name',)
+        indexes = (
+            models.Index(fields=('name', 'id'), name='title_name_id_idx'),
+            models.Index(fields=('rating', 'id'),
+                         name='title_rating_id_idx'),
+            models.Index(fields=('year', 'id'), name='title_year_id_idx'),
+            models.Index(fields=('trending_score', 'id'),
+                         name='title_trending_idx'),
+        )
 
     def __str__(self):
         return self.name
 
 
+SCORES = range(1, 11)
+
+
+class ScoreDistribution(models.Model):
+    """Количество отзывов произведения с каждой оценкой от 1 до 10."""
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score_distribution',
+        verbose_name='Произведение'
+    )
+    score_1 = models.PositiveIntegerField('Оценка 1', default=0)
+    score_2 = models.PositiveIntegerField('Оценка 2', default=0)
+    score_3 = models.PositiveIntegerField('Оценка 3', default=0)
+    score_4 = models.PositiveIntegerField('Оценка 4', default=0)
+    score_5 = models.PositiveIntegerField('Оценка 5', default=0)
+    score_6 = models.PositiveIntegerField('Оценка 6', default=0)
+    score_7 = models.PositiveIntegerField('Оценка 7', default=0)
+    score_8 = models.PositiveIntegerField('Оценка 8', default=0)
+    score_9 = models.PositiveIntegerField('Оценка 9', default=0)
+    score_10 = models.PositiveIntegerField('Оценка 10', default=0)
+
+    class Meta:
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.counts}'
+
+    @staticmethod
+    def field_name(score):
+        return f'score_{score}'
+
+    @property
+    def counts(self):
+        """Словарь оценка -> количество отзывов."""
+        return {
+            score: getattr(self, self.field_name(score)) for score in SCORES}
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    @property
+    def average(self):
+        """Средняя оценка или None, если отзывов нет."""
+        total = self.total
+        if not total:
+            return None
+        return sum(
+            score * amount for score, amount in self.counts.items()) / total
+
+    @property
+    def median(self):
+        """Медиана оценок или None, если отзывов нет."""
+        total = self.total
+        if not total:
+            return None
+        middle = ((total - 1) // 2, total // 2)
+        values = []
+        seen = 0
+        for score, amount in self.counts.items():
+            values.extend(
+                score for position in middle
+                if seen <= position < seen + amount)
+            seen += amount
+        return sum(values) / len(values)
+
+
+class ScoreTotals(models.Model):
+    """
+    Сумма оценок и количество отзывов по всем произведениям.
+    Единственная строка, изменяется F()-выражениями вместе с рейтингом
+    произведения; нужна для средней оценки в рейтингах жанров.
+    """
+    PK = 1
+
+    score_sum = models.BigIntegerField('Сумма оценок', default=0)
+    review_count = models.PositiveIntegerField('Количество отзывов',
+                                               default=0)
+
+    class Meta:
+        verbose_name = 'Итоги оценок'
+        verbose_name_plural = 'Итоги оценок'
+
+    def __str__(self):
+        return f'{self.score_sum} / {self.review_count}'
+
+
 class GenreTitle(models.Model):
     """Промежуточная модель соеднинения Жанров и Произведений."""
     title = models.ForeignKey(Title, on_delete=models.CASCADE)
     genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('genre', 'title'),
+                         name='genre_title_genre_idx'),
+        )
+
     def __str__(self):
         return f'{self.title} {self.genre}'
 
 
+class LeaderboardEntry(models.Model):
+    """
+    Место произведения в рейтинге жанра или категории.
+    У каждой записи заполнен ровно один из genre и category.
+    """
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='leaderboard',
+        verbose_name='Жанр'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='leaderboard',
+        verbose_name='Категория'
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='leaderboard',
+        verbose_name='Произведение'
+    )
+    position = models.PositiveSmallIntegerField('Место')
+    weighted_rating = models.FloatField('Взвешенный рейтинг')
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Места в рейтинге'
+        ordering = ('position',)
+        indexes = (
+            models.Index(fields=('genre', 'position'),
+                         name='leaderboard_genre_idx'),
+            models.Index(fields=('category', 'position'),
+                         name='leaderboard_category_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.position}. {self.title_id}'
+
+
+class SimilarTitle(models.Model):
+    """Похожее произведение, рассчитывается командой build_similar_titles."""
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='similar_titles',
+        verbose_name='Произведение'
+    )
+    similar = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Похожее произведение'
+    )
+    position = models.PositiveSmallIntegerField('Место')
+    score = models.FloatField('Сходство')
+
+    class Meta:
+        verbose_name = 'Похожее произведение'
+        verbose_name_plural = 'Похожие произведения'
+        ordering = ('position',)
+        indexes = (
+            models.Index(fields=('title', 'position'),
+                         name='similar_title_position_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.title_id} -> {self.similar_id}'
+
+
+class DataVersion(models.Model):
+    """
+    Версия области данных (например, titles или reviews:<id>) —
+    время последнего изменения в миллисекундах. Хранится в БД, поэтому
+    общая для всех процессов; используется в ETag и ключах кеша ответов.
+    """
+    scope = models.CharField('Область', max_length=100, primary_key=True)
+    version = models.BigIntegerField('Версия')
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
+
+    def __str__(self):
+        return f'{self.scope}: {self.version}'
+
+
 class ReviewCommentsAbstractModel(models.Model):
     """Абстрактная модель для Отзыва и Комментария."""
     author = models.ForeignKey(
@@ -100,8 +331,10 @@ class ReviewCommentsAbstractModel(models.Model):
         return self.text[settings.LIMIT_TEXT]
 
 
-class Review(ReviewCommentsAbstractModel):
+class Review(CounterFieldsMixin, ReviewCommentsAbstractModel):
     """Отзыв на произведение."""
+    counter_fields = ('comment_count',)
+
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
@@ -113,11 +346,17 @@ class Review(ReviewCommentsAbstractModel):
         error_messages={'validators': 'Диапазон оценки от 1 до 10!'},
         default=1
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False)
 
     class Meta(ReviewCommentsAbstractModel.Meta):
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         default_related_name = 'reviews'
+        indexes = (
+            models.Index(fields=('title', '-pub_date', 'id'),
+                         name='review_title_pub_date_idx'),
+        )
         constraints = [
             models.UniqueConstraint(
                 fields=('title', 'author'),
@@ -125,6 +364,14 @@ class Review(ReviewCommentsAbstractModel):
             )
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает оценку из БД для пересчёта рейтинга при изменении."""
+        instance = super().from_db(db, field_names, values)
+        score = dict(zip(field_names, values)).get('score')
+        instance._loaded_score = None if score is models.DEFERRED else score
+        return instance
+
 
 class Comment(ReviewCommentsAbstractModel):
     """Комментарии к отзывам."""
@@ -138,3 +385,7 @@ class Comment(ReviewCommentsAbstractModel):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = "comments"
+        indexes = (
+            models.Index(fields=('review', '-pub_date', 'id'),
+                         name='comment_review_pub_date_idx'),
+        )
@@ -0,0 +1,110 @@
+import re
+
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from .models import Title
+
+FTS_TABLE = 'reviews_title_search'
+
+
+def get_terms(query):
+    """Слова поискового запроса без служебных символов."""
+    return re.findall(r'\w+', query or '')
+
+
+class SearchBackend:
+    """
+    Поиск произведений по названию и описанию.
+    search аннотирует queryset полем search_rank: чем меньше,
+    тем релевантнее.
+    """
+
+    def index(self, title):
+        pass
+
+    def index_many(self, titles):
+        for title in titles:
+            self.index(title)
+
+    def remove(self, title_id):
+        pass
+
+    def rebuild(self):
+        return Title.objects.count()
+
+    def search(self, queryset, query):
+        terms = get_terms(query)
+        if not terms:
+            return queryset.annotate(
+                search_rank=Value(0.0, output_field=FloatField()))
+        for term in terms:
+            queryset = queryset.filter(
+                Q(name__icontains=term) | Q(description__icontains=term))
+        return queryset.annotate(search_rank=Case(
+            When(name__icontains=terms[0], then=Value(0.0)),
+            default=Value(1.0),
+            output_field=FloatField(),
+        ))
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """Полнотекстовый индекс SQLite FTS5 с ранжированием bm25."""
+
+    def index(self, title):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT OR REPLACE INTO {FTS_TABLE} '
+                '(rowid, name, description) VALUES (%s, %s, %s)',
+                (title.pk, title.name, title.description))
+
+    def index_many(self, titles):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {FTS_TABLE} '
+                '(rowid, name, description) VALUES (%s, %s, %s)',
+                [(title.pk, title.name, title.description)
+                 for title in titles])
+
+    def remove(self, title_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (title_id,))
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+                f'SELECT id, name, description FROM {Title._meta.db_table}')
+            return cursor.rowcount
+
+    def search(self, queryset, query):
+        terms = get_terms(query)
+        if not terms:
+            return super().search(queryset, query)
+        match = ' '.join(f'"{term}"*' for term in terms)
+        table = Title._meta.db_table
+        # RawSQL в id__in оборачивается в двойные скобки, и SQLite
+        # сравнивает id только с первой строкой подзапроса.
+        return queryset.extra(
+            where=(f'{table}.id IN (SELECT rowid FROM {FTS_TABLE} '
+                   f'WHERE {FTS_TABLE} MATCH %s)',),
+            params=(match,),
+        ).annotate(search_rank=RawSQL(
+            f'SELECT bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id',
+            (match,),
+            output_field=FloatField(),
+        ))
+
+
+SEARCH_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_search_backend():
+    """Поисковый бэкенд для текущей базы данных."""
+    return SEARCH_BACKENDS.get(connection.vendor, SearchBackend)()
@@ -0,0 +1,258 @@
+import threading
+
+from django.conf import settings
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+
+from . import leaderboards, trending
+from .bulk import bulk_saved
+from .genre_masks import assign_bits, get_free_bit, update_genre_masks
+from .models import (SCORES, Comment, Genre, GenreTitle, Review,
+                     ScoreDistribution, Title)
+from .search import get_search_backend
+
+# Отзывы, удаляемые в текущем потоке: при каскадном удалении их
+# комментариев удаляемые строки отзывов не обновляются.
+_deleting_reviews = threading.local()
+
+
+def get_deleting_reviews():
+    if not hasattr(_deleting_reviews, 'ids'):
+        _deleting_reviews.ids = set()
+    return _deleting_reviews.ids
+
+
+def shift_rating(title_id, score_delta, count_delta, activity=0):
+    """
+    Инкрементально изменяет сумму оценок и количество отзывов произведения
+    и пересчитывает сохранённый рейтинг одним UPDATE-запросом,
+    итоги оценок по всем произведениям — вторым.
+    activity добавляется к популярности произведения в том же запросе.
+    """
+    score_sum = F('score_sum') + score_delta
+    review_count = F('review_count') + count_delta
+    extra = {}
+    if activity:
+        extra['trending_score'] = F('trending_score') + activity
+    Title.objects.filter(pk=title_id).update(
+        **extra,
+        score_sum=score_sum,
+        review_count=review_count,
+        rating=Case(
+            When(review_count__lte=-count_delta, then=Value(None)),
+            default=Cast(score_sum, FloatField()) / review_count,
+            output_field=FloatField(),
+        ),
+    )
+    leaderboards.shift_totals(score_delta, count_delta)
+
+
+def recalculate_rating(title_id):
+    """Пересчитывает рейтинг произведения по всем его отзывам."""
+    stored = Title.objects.filter(pk=title_id).values(
+        'score_sum', 'review_count').first()
+    stats = Review.objects.filter(title_id=title_id).aggregate(
+        score_sum=Sum('score'), review_count=Count('id'))
+    score_sum = stats['score_sum'] or 0
+    review_count = stats['review_count']
+    Title.objects.filter(pk=title_id).update(
+        score_sum=score_sum,
+        review_count=review_count,
+        rating=score_sum / review_count if review_count else None,
+    )
+    if stored is not None:
+        leaderboards.shift_totals(score_sum - stored['score_sum'],
+                                  review_count - stored['review_count'])
+
+
+def shift_distribution(title_id, changes):
+    """
+    Изменяет счётчики оценок произведения одним UPDATE-запросом.
+    changes — словарь оценка -> изменение количества.
+    Возвращает количество обновлённых строк.
+    """
+    return ScoreDistribution.objects.filter(title_id=title_id).update(**{
+        ScoreDistribution.field_name(score):
+            F(ScoreDistribution.field_name(score)) + delta
+        for score, delta in changes.items()
+    })
+
+
+def recalculate_distribution(title_id):
+    """Пересчитывает распределение оценок произведения по его отзывам."""
+    counts = dict(Review.objects.filter(title_id=title_id).order_by(
+    ).values_list('score').annotate(amount=Count('id')))
+    ScoreDistribution.objects.update_or_create(title_id=title_id, defaults={
+        ScoreDistribution.field_name(score): counts.get(score, 0)
+        for score in SCORES
+    })
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Обновляет рейтинг и распределение оценок произведения
+    при создании и изменении отзыва.
+    """
+    if raw:
+        return
+    changes = {}
+    if created:
+        shift_rating(instance.title_id, instance.score, 1,
+                     activity=settings.TRENDING_REVIEW_WEIGHT)
+        changes = {instance.score: 1}
+    elif getattr(instance, '_loaded_score', None) is None:
+        recalculate_rating(instance.title_id)
+        recalculate_distribution(instance.title_id)
+    elif instance.score != instance._loaded_score:
+        shift_rating(
+            instance.title_id, instance.score - instance._loaded_score, 0)
+        changes = {instance._loaded_score: -1, instance.score: 1}
+    if changes and not shift_distribution(instance.title_id, changes):
+        recalculate_distribution(instance.title_id)
+    instance._loaded_score = instance.score
+    leaderboards.refresh_title(instance.title_id)
+
+
+@receiver(pre_delete, sender=Review)
+def review_deleting(sender, instance, **kwargs):
+    """Запоминает удаляемый отзыв до каскадного удаления комментариев."""
+    get_deleting_reviews().add(instance.pk)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """
+    Обновляет рейтинг и распределение оценок при удалении отзыва.
+    При удалении произведения распределение удаляется каскадно,
+    поэтому отсутствующая строка не пересоздаётся.
+    """
+    get_deleting_reviews().discard(instance.pk)
+    if instance.title_id in leaderboards.get_deleting():
+        # Рейтинг и распределение удаляемого произведения не обновляются,
+        # итоги оценок уменьшаются один раз в title_deleted.
+        return
+    shift_rating(instance.title_id, -instance.score, -1)
+    shift_distribution(instance.title_id, {instance.score: -1})
+    leaderboards.refresh_title(instance.title_id)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Увеличивает счётчик комментариев отзыва и популярность произведения.
+    """
+    if created and not raw:
+        Review.objects.filter(pk=instance.review_id).update(
+            comment_count=F('comment_count') + 1)
+        trending.bump_by_review(
+            instance.review_id, settings.TRENDING_COMMENT_WEIGHT)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """
+    Уменьшает счётчик комментариев отзыва, если сам отзыв не удаляется.
+    """
+    if instance.review_id in get_deleting_reviews():
+        return
+    Review.objects.filter(pk=instance.review_id).update(
+        comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Обновляет поисковый индекс при сохранении произведения
+    и создаёт пустое распределение оценок для нового произведения.
+    """
+    if raw:
+        return
+    get_search_backend().index(instance)
+    if created:
+        ScoreDistribution.objects.create(title=instance)
+    else:
+        leaderboards.refresh_title(instance.pk)
+
+
+@receiver(pre_delete, sender=Title)
+def title_deleting(sender, instance, **kwargs):
+    """
+    Запоминает рейтинги, в которых находится удаляемое произведение,
+    и его сохранённые суммы оценок до каскадного удаления отзывов.
+    """
+    leaderboards.start_delete(instance.pk)
+    instance._stored_totals = Title.objects.filter(
+        pk=instance.pk).values_list('score_sum', 'review_count').first()
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    """
+    Удаляет произведение из поискового индекса и рейтингов
+    и вычитает его оценки из итогов одним запросом.
+    """
+    get_search_backend().remove(instance.pk)
+    stored = getattr(instance, '_stored_totals', None)
+    if stored is not None and stored[1]:
+        leaderboards.shift_totals(-stored[0], -stored[1])
+    leaderboards.finish_delete(instance.pk)
+
+
+@receiver(pre_save, sender=Genre)
+def genre_bit(sender, instance, raw=False, **kwargs):
+    """Назначает новому жанру свободный бит маски."""
+    if not raw and instance.bit is None:
+        instance.bit = get_free_bit()
+
+
+@receiver((post_save, post_delete), sender=GenreTitle)
+def genre_title_changed(sender, instance, raw=False, **kwargs):
+    """Пересчитывает маску жанров и рейтинги жанров произведения."""
+    if not raw and instance.title_id not in leaderboards.get_deleting():
+        update_genre_masks([instance.title_id])
+        leaderboards.refresh_title(instance.title_id)
+
+
+@receiver(m2m_changed, sender=GenreTitle)
+def title_genres_changed(sender, instance, action, pk_set, **kwargs):
+    """
+    Пересчитывает маски жанров и рейтинги жанров
+    при изменении связи many-to-many.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    title_ids = [instance.pk] if isinstance(instance, Title) else pk_set
+    update_genre_masks(title_ids)
+    if title_ids is None:
+        leaderboards.rebuild()
+        return
+    for title_id in title_ids:
+        leaderboards.refresh_title(title_id)
+
+
+@receiver(bulk_saved, sender=Genre)
+def genres_bulk_saved(sender, created, **kwargs):
+    """Назначает биты маски жанрам, созданным через bulk_create."""
+    if created:
+        assign_bits()
+
+
+@receiver(bulk_saved, sender=Title)
+def titles_bulk_saved(sender, instances, created, fields, **kwargs):
+    """
+    Поисковый индекс, распределения оценок и рейтинги категорий
+    для произведений, сохранённых без post_save.
+    """
+    if created or {'name', 'description'} & set(fields):
+        get_search_backend().index_many(instances)
+    if created:
+        ScoreDistribution.objects.bulk_create(
+            (ScoreDistribution(title=title) for title in instances),
+            ignore_conflicts=True)
+    elif 'category' in fields:
+        for title in instances:
+            leaderboards.refresh_title(title.pk)
@@ -0,0 +1,98 @@
+import heapq
+import math
+from collections import defaultdict
+
+from django.dispatch import Signal
+
+from . import versions
+from .models import GenreTitle, Review, SimilarTitle
+
+# Область данных похожих произведений: её версия — время последнего
+# пересчёта, по ней ответы API кешируются во всех процессах.
+BUILD_SCOPE = 'similar'
+
+# Отправляется после пересчёта похожих произведений.
+similar_titles_built = Signal()
+
+# Данные процесса для compute_chunk: заполняются init_worker один раз
+# на процесс, чтобы не передавать векторы с каждой порцией.
+_state = {}
+
+
+def load_vectors():
+    """
+    Разреженные бинарные векторы произведений: жанры и авторы отзывов.
+    {'genre': {title_id: {genre_id, ...}}, 'reviewer': {title_id: {...}}}
+    """
+    vectors = {'genre': defaultdict(set), 'reviewer': defaultdict(set)}
+    for title_id, genre_id in GenreTitle.objects.values_list(
+            'title_id', 'genre_id').iterator():
+        vectors['genre'][title_id].add(genre_id)
+    for title_id, author_id in Review.objects.order_by().values_list(
+            'title_id', 'author_id').iterator():
+        vectors['reviewer'][title_id].add(author_id)
+    return {kind: dict(vector) for kind, vector in vectors.items()}
+
+
+def invert(vectors):
+    """Инвертированный индекс: признак -> произведения с этим признаком."""
+    postings = defaultdict(list)
+    for title_id, features in vectors.items():
+        for feature in features:
+            postings[feature].append(title_id)
+    return postings
+
+
+def init_worker(vectors, weights, top_k):
+    _state.update(
+        vectors=vectors,
+        postings={kind: invert(vector) for kind, vector in vectors.items()},
+        weights=weights,
+        top_k=top_k,
+    )
+
+
+def compute_chunk(title_ids):
+    """
+    Похожие произведения для порции: взвешенная сумма косинусных мер
+    по жанрам и авторам отзывов. Пересечения считаются только для
+    произведений с общими признаками через инвертированный индекс.
+    Возвращает {title_id: [(similar_id, score), ...]}.
+    """
+    results = {}
+    for title_id in title_ids:
+        scores = defaultdict(float)
+        for kind, vectors in _state['vectors'].items():
+            features = vectors.get(title_id)
+            if not features:
+                continue
+            common = defaultdict(int)
+            for feature in features:
+                for other in _state['postings'][kind][feature]:
+                    if other != title_id:
+                        common[other] += 1
+            weight = _state['weights'][kind]
+            for other, amount in common.items():
+                scores[other] += weight * amount / math.sqrt(
+                    len(features) * len(vectors[other]))
+        results[title_id] = heapq.nlargest(
+            _state['top_k'], scores.items(),
+            key=lambda item: (item[1], -item[0]))
+    return results
+
+
+def store(results):
+    """Заменяет сохранённые похожие произведения для порции."""
+    SimilarTitle.objects.filter(title_id__in=results).delete()
+    SimilarTitle.objects.bulk_create(
+        SimilarTitle(
+            title_id=title_id, similar_id=similar_id,
+            position=position, score=score)
+        for title_id, similar in results.items()
+        for position, (similar_id, score) in enumerate(similar, start=1))
+
+
+def finish_build(sender):
+    """Сохраняет в БД время пересчёта и сообщает о нём."""
+    versions.bump(BUILD_SCOPE)
+    similar_titles_built.send(sender=sender)
@@ -0,0 +1,87 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import F
+from django.dispatch import Signal
+from django.utils import timezone
+
+from . import versions
+from .models import Comment, DataVersion, Review, Title
+
+# Отправляется после затухания или пересчёта популярности.
+trending_decayed = Signal()
+
+# Время прошлого затухания в миллисекундах хранится в DataVersion.
+DECAY_SCOPE = 'trending-decay'
+
+
+def get_factor(hours):
+    """Множитель затухания популярности за hours часов."""
+    return 0.5 ** (hours / settings.TRENDING_HALF_LIFE)
+
+
+def bump_by_review(review_id, weight):
+    """
+    Увеличивает популярность произведения отзыва одним UPDATE
+    с подзапросом, без загрузки отзыва.
+    """
+    Title.objects.filter(reviews__id=review_id).update(
+        trending_score=F('trending_score') + weight)
+
+
+def decay(first_hours, now=None):
+    """
+    Уменьшает популярность всех произведений пропорционально времени,
+    прошедшему с прошлого затухания; время затухания сохраняется в БД,
+    поэтому повторный запуск не уменьшает популярность дважды.
+    first_hours — прошедшее время, если затуханий ещё не было.
+    Порядок произведений не меняется, поэтому сортированный индекс
+    остаётся актуальным; слишком малые значения обнуляются.
+    Вызывается в транзакции. Возвращает прошедшее время в часах
+    и количество обнулённых произведений.
+    """
+    now = now or versions.now_version()
+    last = DataVersion.objects.select_for_update().filter(
+        scope=DECAY_SCOPE).values_list('version', flat=True).first()
+    hours = max(now - last, 0) / 3600 / 1000 if last else first_hours
+    active = Title.objects.filter(trending_score__gt=0)
+    active.update(trending_score=F('trending_score') * get_factor(hours))
+    cleared = active.filter(
+        trending_score__lt=settings.TRENDING_MIN_SCORE
+    ).update(trending_score=0)
+    DataVersion.objects.update_or_create(
+        scope=DECAY_SCOPE, defaults={'version': now})
+    trending_decayed.send(sender=Title)
+    return hours, cleared
+
+
+def rebuild(now=None):
+    """
+    Пересчитывает популярность по датам отзывов и комментариев.
+    Возвращает количество изменённых произведений.
+    """
+    now = now or timezone.now()
+    scores = defaultdict(float)
+    events = (
+        (Review.objects.values_list('title_id', 'pub_date'),
+         settings.TRENDING_REVIEW_WEIGHT),
+        (Comment.objects.values_list('review__title_id', 'pub_date'),
+         settings.TRENDING_COMMENT_WEIGHT),
+    )
+    for queryset, weight in events:
+        for title_id, pub_date in queryset.order_by().iterator():
+            hours = (now - pub_date).total_seconds() / 3600
+            scores[title_id] += weight * get_factor(max(hours, 0))
+    changed = []
+    for title in Title.objects.only('id', 'trending_score').iterator():
+        score = scores[title.id]
+        if score < settings.TRENDING_MIN_SCORE:
+            score = 0
+        if title.trending_score != score:
+            title.trending_score = score
+            changed.append(title)
+    Title.objects.bulk_update(changed, ('trending_score',), batch_size=500)
+    DataVersion.objects.update_or_create(
+        scope=DECAY_SCOPE, defaults={'version': int(now.timestamp() * 1000)})
+    trending_decayed.send(sender=Title)
+    return len(changed)
@@ -0,0 +1,40 @@
+import time
+
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from .models import DataVersion
+
+# Общая область: её версия входит во все ключи и ETag ответов.
+# Обновляется командами, которые меняют данные в обход сигналов.
+ALL = 'all'
+
+
+def now_version():
+    """Версия данных — время изменения в миллисекундах."""
+    return int(time.time() * 1000)
+
+
+def get_versions(scopes):
+    """
+    Версии областей данных одним запросом. Область, которая ещё
+    не изменялась, имеет версию 0: при первом изменении она получает
+    текущее время.
+    """
+    versions = dict(DataVersion.objects.filter(
+        scope__in=scopes).values_list('scope', 'version'))
+    return [versions.get(scope, 0) for scope in scopes]
+
+
+def bump(*scopes):
+    """
+    Увеличивает версии областей данных: не меньше текущего времени
+    и строго больше предыдущей версии.
+    """
+    scopes = list(dict.fromkeys(scopes))
+    version = now_version()
+    DataVersion.objects.bulk_create(
+        (DataVersion(scope=scope, version=version) for scope in scopes),
+        ignore_conflicts=True)
+    DataVersion.objects.filter(scope__in=scopes).update(
+        version=Greatest(F('version') + 1, Value(version)))
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutgoingEmail, User
 
 
 class UserAdmin(admin.ModelAdmin):
@@ -12,4 +12,15 @@ class UserAdmin(admin.ModelAdmin):
     list_editable = ('role',)
 
 
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Класс раздела очереди писем."""
+    list_display = ('recipient', 'subject', 'created', 'attempts', 'sent',
+                    'next_attempt')
+    search_fields = ('recipient',)
+    list_filter = ('sent', 'attempts',)
+    # Текст письма содержит код подтверждения.
+    exclude = ('message',)
+
+
 admin.site.register(User, UserAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
@@ -0,0 +1,157 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+
+class Command(BaseCommand):
+    """Отправка писем из очереди пачками через одно соединение."""
+
+    help = 'Отправляет письма из очереди OutgoingEmail с повторами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Количество писем, отправляемых за одну пачку.')
+        parser.add_argument(
+            '--max-attempts', type=int,
+            default=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+            help='Количество попыток отправки письма.')
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать новые письма.')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза в секундах между опросами очереди в режиме --loop.')
+
+    def pending(self, max_attempts):
+        return OutgoingEmail.objects.filter(
+            sent__isnull=True,
+            next_attempt__lte=timezone.now(),
+            attempts__lt=max_attempts,
+        )
+
+    def claim_batch(self, batch_size, max_attempts):
+        """
+        Забирает пачку писем короткой транзакцией: письма помечаются
+        токеном обработчика, попытка засчитывается, а следующая
+        откладывается на EMAIL_OUTBOX_CLAIM_TIMEOUT. Другие обработчики
+        эти письма не берут, а письма упавшего обработчика вернутся
+        в очередь.
+        """
+        token = uuid.uuid4().hex
+        with transaction.atomic():
+            batch = self.pending(max_attempts)
+            if connection.features.has_select_for_update_skip_locked:
+                batch = batch.select_for_update(skip_locked=True)
+            ids = list(batch.values_list('id', flat=True)[:batch_size])
+            # Условия повторяются в UPDATE: без skip_locked письмо
+            # получает только обработчик, изменивший его первым.
+            self.pending(max_attempts).filter(pk__in=ids).update(
+                claim_token=token,
+                attempts=F('attempts') + 1,
+                next_attempt=timezone.now() + timedelta(
+                    seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT))
+        return list(OutgoingEmail.objects.filter(claim_token=token))
+
+    def send_batch(self, emails):
+        """
+        Отправка вне транзакции: медленный SMTP не держит блокировки.
+        Соединение открывается на каждую пачку: в режиме --loop сервер
+        закрывает простаивающие соединения, а SMTP-бэкенд Django
+        не переподключается сам.
+        """
+        sent, failed, latency = [], [], []
+        mail_connection = get_connection(fail_silently=False)
+        try:
+            mail_connection.open()
+        except Exception as error:
+            for email in emails:
+                self.fail(email, error)
+            return sent, emails, latency
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    subject=email.subject,
+                    body=email.message,
+                    from_email=email.from_email,
+                    to=[email.recipient],
+                    connection=mail_connection,
+                )
+                try:
+                    message.send(fail_silently=False)
+                except Exception as error:
+                    self.fail(email, error)
+                    failed.append(email)
+                else:
+                    email.sent = timezone.now()
+                    email.last_error = ''
+                    # Текст содержит код подтверждения и после отправки
+                    # не хранится.
+                    email.message = ''
+                    email.claim_token = ''
+                    latency.append(
+                        (email.sent - email.created).total_seconds())
+                    sent.append(email)
+        finally:
+            mail_connection.close()
+        return sent, failed, latency
+
+    def fail(self, email, error):
+        """Возвращает письмо в очередь с увеличенной паузой."""
+        email.last_error = str(error)
+        email.claim_token = ''
+        email.next_attempt = timezone.now() + timedelta(
+            seconds=settings.EMAIL_OUTBOX_RETRY_DELAY
+            * 2 ** (email.attempts - 1))
+
+    def record(self, emails, max_attempts):
+        """
+        Сохраняет результаты отправки второй транзакцией и стирает
+        текст писем, для которых попытки закончились.
+        """
+        with transaction.atomic():
+            OutgoingEmail.objects.bulk_update(
+                emails, ('sent', 'message', 'last_error', 'next_attempt',
+                         'claim_token'))
+            OutgoingEmail.objects.filter(
+                sent__isnull=True, attempts__gte=max_attempts,
+            ).exclude(message='').update(message='')
+
+    def handle(self, *args, **options):
+        while True:
+            emails = self.claim_batch(
+                options['batch_size'], options['max_attempts'])
+            if emails:
+                started = time.monotonic()
+                sent, failed, latency = self.send_batch(emails)
+                duration = time.monotonic() - started
+                self.record(sent + failed, options['max_attempts'])
+                self.report(sent, failed, latency, duration,
+                            options['max_attempts'])
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def report(self, sent, failed, latency, duration, max_attempts):
+        depth = OutgoingEmail.objects.filter(
+            sent__isnull=True, attempts__lt=max_attempts).count()
+        average = sum(latency) / len(latency) if latency else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'- отправлено {len(sent)}, ошибок {len(failed)} '
+            f'за {duration:.3f} с; в очереди {depth}; '
+            f'средняя задержка доставки {average:.3f} с'))
+        for email in failed:
+            self.stderr.write(
+                f'- {email.recipient}: попытка {email.attempts}, '
+                f'{email.last_error}')
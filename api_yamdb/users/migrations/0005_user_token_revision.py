@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_revision',
+            field=models.PositiveIntegerField(default=0, help_text='Увеличивается при смене роли или прав, выданные ранее токены отклоняются', verbose_name='Ревизия токенов'),
+        ),
+    ]
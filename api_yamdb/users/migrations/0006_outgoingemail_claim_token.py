@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_token_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='claim_token',
+            field=models.CharField(blank=True, db_index=True, help_text='Заполняется, пока письмо отправляется обработчиком', max_length=32, verbose_name='Токен обработчика'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 from .validators import validate_username
 
@@ -50,6 +51,11 @@ class User(AbstractUser):
         choices=USER_ROLE,
         default=USER,
         help_text='Роль пользователя')
+    token_revision = models.PositiveIntegerField(
+        verbose_name='Ревизия токенов',
+        default=0,
+        help_text='Увеличивается при смене роли или прав, '
+                  'выданные ранее токены отклоняются')
 
     class Meta:
         verbose_name = 'Пользователь'
@@ -69,3 +75,35 @@ class User(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == MODERATOR
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку."""
+    subject = models.CharField('Тема', max_length=settings.LIMIT_NAME)
+    message = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель',
+                                   max_length=settings.LIMIT_EMAIL)
+    recipient = models.EmailField('Получатель',
+                                  max_length=settings.LIMIT_EMAIL)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    next_attempt = models.DateTimeField('Следующая попытка',
+                                        default=timezone.now)
+    attempts = models.PositiveSmallIntegerField('Попыток отправки',
+                                                default=0)
+    sent = models.DateTimeField('Дата отправки', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    claim_token = models.CharField(
+        'Токен обработчика', max_length=32, blank=True, db_index=True,
+        help_text='Заполняется, пока письмо отправляется обработчиком')
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('next_attempt',)
+        indexes = (
+            models.Index(fields=('sent', 'next_attempt'),
+                         name='outgoing_email_pending_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
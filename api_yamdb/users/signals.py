@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import User
+
+USER_STATE_KEY = 'user-state:{}'
+# Поля пользователя, записываемые в токен.
+USER_CLAIM_FIELDS = ('username', 'role', 'is_staff', 'is_superuser')
+# Изменение этих полей отзывает выданные пользователю токены:
+# пользователь запроса строится из полей токена.
+USER_REVOKING_FIELDS = USER_CLAIM_FIELDS + ('is_active',)
+# Состояние пользователя, которое сверяется с токеном на каждом запросе.
+USER_STATE_FIELDS = ('token_revision', 'is_active')
+
+
+def get_user_state(user_id):
+    """
+    Ревизия токенов и активность пользователя из БД.
+    Кешируются на USER_STATE_CACHE_TIMEOUT секунд и сбрасываются после
+    фиксации изменений пользователя. None — пользователь удалён.
+    """
+    key = USER_STATE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = User.objects.filter(pk=user_id).values(
+            *USER_STATE_FIELDS).first() or {}
+        cache.set(key, state, settings.USER_STATE_CACHE_TIMEOUT)
+    return state or None
+
+
+def cache_user_state(user):
+    """Кеширует состояние пользователя, для которого выдан токен."""
+    cache.set(USER_STATE_KEY.format(user.pk),
+              {field: getattr(user, field) for field in USER_STATE_FIELDS},
+              settings.USER_STATE_CACHE_TIMEOUT)
+
+
+def get_changed_fields(user):
+    """Поля пользователя, изменённые последним сохранением."""
+    return getattr(user, '_changed_fields', frozenset())
+
+
+def reset_user_state(user_id):
+    """Сбрасывает кеш состояния после фиксации транзакции."""
+    transaction.on_commit(
+        lambda: cache.delete(USER_STATE_KEY.format(user_id)))
+
+
+@receiver(pre_save, sender=User)
+def user_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Определяет, меняются ли имя, роль или права пользователя."""
+    instance._changed_fields = frozenset()
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not set(
+            USER_REVOKING_FIELDS) & set(update_fields):
+        return
+    stored = User.objects.filter(pk=instance.pk).values(
+        *USER_REVOKING_FIELDS).first()
+    if stored is not None:
+        instance._changed_fields = frozenset(
+            field for field in USER_REVOKING_FIELDS
+            if stored[field] != getattr(instance, field))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, **kwargs):
+    """Отзывает выданные токены при смене имени, роли или прав."""
+    if raw:
+        return
+    if get_changed_fields(instance) & set(USER_REVOKING_FIELDS):
+        User.objects.filter(pk=instance.pk).update(
+            token_revision=F('token_revision') + 1)
+        instance.refresh_from_db(fields=('token_revision',))
+    reset_user_state(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    """Отзывает выданные токены удалённого пользователя."""
+    reset_user_state(instance.pk)
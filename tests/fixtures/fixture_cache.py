@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    from api.autocomplete import prefix_index
+    cache.clear()
+    prefix_index.reset()
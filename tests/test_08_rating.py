@@ -0,0 +1,35 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_reviews
+
+
+class Test08RatingAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_after_delete(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        client_moderator = auth_client(moderator)
+        client_moderator.delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/')
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json().get('rating') == 3, (
+            'Проверьте, что после удаления отзыва рейтинг произведения пересчитывается'
+        )
+        for review in reviews[1:]:
+            client_moderator.delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/')
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json().get('rating') is None, (
+            'Проверьте, что после удаления всех отзывов `rating` равен `None`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_ratings(self, admin_client, admin):
+        from reviews.models import Title
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        Title.objects.filter(pk=titles[0]['id']).update(
+            score_sum=0, review_count=0, rating=None)
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (12, 3, 4), (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает рейтинг по отзывам'
+        )
@@ -0,0 +1,44 @@
+import pytest
+
+from .common import create_reviews, create_titles
+
+
+class Test09CursorPaginationAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get('/api/v1/titles/?pagination=cursor&limit=1')
+        assert response.status_code == 200, (
+            'Проверьте, что при GET запросе `/api/v1/titles/?pagination=cursor` возвращается статус 200'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что keyset-пагинация не возвращает параметр `count`'
+        )
+        assert [item['name'] for item in data['results']] == ['Поворот туда'], (
+            'Проверьте, что keyset-пагинация произведений упорядочена по `name`'
+        )
+        data = client.get(data['next']).json()
+        assert [item['name'] for item in data['results']] == ['Проект'], (
+            'Проверьте, что ссылка `next` keyset-пагинации ведёт на следующую страницу'
+        )
+        assert data['next'] is None and data['previous'], (
+            'Проверьте ссылки `next` и `previous` на последней странице keyset-пагинации'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_cursor(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = client.get(f'{url}?pagination=cursor&limit=2').json()
+        received = [item['id'] for item in data['results']]
+        data = client.get(data['next']).json()
+        received += [item['id'] for item in data['results']]
+        assert received == [review['id'] for review in reversed(reviews)], (
+            'Проверьте, что keyset-пагинация отзывов отдаёт все отзывы от новых к старым'
+        )
+        data = client.get(url).json()
+        assert data['count'] == len(reviews), (
+            'Проверьте, что без параметра `pagination=cursor` сохраняется пагинация limit/offset'
+        )
@@ -0,0 +1,100 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments, create_reviews
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+class Test10QueryCountAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_query_count(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        for limit in (1, len(reviews)):
+            assert count_queries(client, f'{url}?limit={limit}') == 4, (
+                'Проверьте, что количество SQL-запросов к `/api/v1/titles/{title_id}/reviews/` '
+                'не зависит от размера страницы, а авторы загружаются вместе с отзывами'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_comments_query_count(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        for limit in (1, len(comments)):
+            assert count_queries(client, f'{url}?limit={limit}') == 4, (
+                'Проверьте, что количество SQL-запросов к '
+                '`/api/v1/titles/{title_id}/reviews/{review_id}/comments/` не зависит от размера страницы, '
+                'а авторы загружаются вместе с комментариями'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_review_create_query_count(self, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data={'text': 'text', 'score': 5})
+        assert response.status_code == 201
+        assert len(context.captured_queries) == 11, (
+            'Проверьте, что при POST запросе `/api/v1/titles/{title_id}/reviews/` '
+            'произведение загружается один раз за запрос, '
+            'рейтинг, итоги и распределение оценок обновляются одним UPDATE каждое, '
+            'версии данных кеша — отдельной транзакцией после фиксации, а рейтинги жанров не пересчитываются для произведения вне рейтинга'
+        )
+        response = admin_client.post(url, data={'text': 'text', 'score': 5})
+        assert response.status_code == 400, (
+            'Проверьте, что нельзя добавить второй отзыв на то же самое произведение'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_comment_parent_chain(self, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data={'text': 'text'})
+        assert response.status_code == 201
+        assert len(context.captured_queries) == 8, (
+            'Проверьте, что при POST запросе `/api/v1/titles/{title_id}/reviews/{review_id}/comments/` '
+            'отзыв загружается один раз за запрос, счётчик комментариев '
+            'и популярность произведения обновляются одним UPDATE каждый, '
+            'а версии данных кеша — одной транзакцией из двух запросов'
+        )
+        response = admin_client.get(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}/comments/')
+        assert response.status_code == 404, (
+            'Проверьте, что комментарии отзыва недоступны по url чужого произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_review_delete_with_comments(self, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        reviews_before = admin_client.get(url).json()['results']
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(f'{url}{reviews[0]["id"]}/')
+        assert response.status_code == 204
+        queries = [query['sql'] for query in context.captured_queries]
+        lookups = [sql for sql in queries if sql.startswith('SELECT "reviews_review"')]
+        assert len(lookups) == 1, (
+            'Проверьте, что при каскадном удалении комментариев отзыв '
+            'не загружается для каждого комментария'
+        )
+        assert not [sql for sql in queries if sql.startswith('UPDATE "reviews_review"')], (
+            'Проверьте, что при каскадном удалении комментариев не обновляется '
+            'счётчик комментариев удаляемого отзыва'
+        )
+        bumps = [sql for sql in queries if sql.startswith('UPDATE "reviews_dataversion"')]
+        assert len(bumps) == 1, (
+            'Проверьте, что версии данных кеша обновляются один раз за транзакцию'
+        )
+        reviews_after = admin_client.get(url).json()['results']
+        assert len(reviews_after) == len(reviews_before) - 1, (
+            'Проверьте, что кеш отзывов сбрасывается при удалении отзыва'
+        )
@@ -0,0 +1,108 @@
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.management import call_command
+
+from users.models import OutgoingEmail
+
+
+class Test11EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_enqueues_email(self, client):
+        outbox_before_count = len(mail.outbox)
+        data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+        client.post(self.url_signup, data=data)
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что письмо с кодом подтверждения не отправляется во время запроса'
+        )
+        email = OutgoingEmail.objects.get(recipient=data['email'])
+        call_command('send_emails')
+        email.refresh_from_db()
+        assert email.sent is not None and email.attempts == 1, (
+            'Проверьте, что команда `send_emails` отправляет письма из очереди'
+        )
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert 'код' in mail.outbox[-1].body and email.message == '', (
+            'Проверьте, что текст с кодом подтверждения не хранится после отправки'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_failed_email_is_retried_later(self, client):
+        data = {'email': 'retry@yamdb.fake', 'username': 'retry'}
+        client.post(self.url_signup, data=data)
+        with mock.patch.object(EmailMessage, 'send', side_effect=OSError('down')):
+            call_command('send_emails')
+        email = OutgoingEmail.objects.get(recipient=data['email'])
+        assert email.sent is None and email.attempts == 1, (
+            'Проверьте, что неотправленное письмо остаётся в очереди'
+        )
+        assert email.next_attempt > email.created and email.last_error == 'down', (
+            'Проверьте, что повторная отправка откладывается'
+        )
+        assert email.message, (
+            'Проверьте, что текст неотправленного письма сохраняется для повтора'
+        )
+        OutgoingEmail.objects.update(next_attempt=email.created)
+        with mock.patch.object(EmailMessage, 'send', side_effect=OSError('down')):
+            call_command('send_emails', max_attempts=2)
+        email.refresh_from_db()
+        assert email.attempts == 2 and email.message == '', (
+            'Проверьте, что текст письма стирается, когда попытки отправки закончились'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_claimed_emails_are_sent_once(self, client):
+        from django.db import connection
+        from users.management.commands.send_emails import Command
+        for number in range(2):
+            data = {'email': f'claim{number}@yamdb.fake', 'username': f'claim{number}'}
+            client.post(self.url_signup, data=data)
+        claimed = Command().claim_batch(batch_size=1, max_attempts=5)
+        assert len(claimed) == 1 and claimed[0].attempts == 1, (
+            'Проверьте, что обработчик помечает взятые письма и засчитывает попытку'
+        )
+        in_transaction = []
+        original_send = EmailMessage.send
+
+        def send(message, *args, **kwargs):
+            in_transaction.append(connection.in_atomic_block)
+            return original_send(message, *args, **kwargs)
+
+        with mock.patch.object(EmailMessage, 'send', send):
+            call_command('send_emails')
+        assert in_transaction == [False], (
+            'Проверьте, что письма отправляются вне транзакции, '
+            'а письма, взятые другим обработчиком, не отправляются повторно'
+        )
+        email = OutgoingEmail.objects.get(pk=claimed[0].pk)
+        assert email.sent is None and email.claim_token, (
+            'Проверьте, что письмо другого обработчика не изменяется'
+        )
+        sent = OutgoingEmail.objects.exclude(pk=email.pk).get()
+        assert sent.sent is not None and sent.claim_token == '' and sent.attempts == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_connection_per_batch(self, client):
+        from django.core.mail import get_connection
+        from django.core.mail.backends.locmem import EmailBackend
+        for number in range(2):
+            data = {'email': f'batch{number}@yamdb.fake', 'username': f'batch{number}'}
+            client.post(self.url_signup, data=data)
+        with mock.patch.object(EmailBackend, 'open', side_effect=OSError('refused')):
+            call_command('send_emails')
+        assert set(OutgoingEmail.objects.values_list('sent', 'attempts', 'last_error')) == {
+            (None, 1, 'refused')}, (
+            'Проверьте, что ошибка соединения возвращает пачку в очередь, а не завершает обработчик'
+        )
+        OutgoingEmail.objects.update(next_attempt=OutgoingEmail.objects.first().created)
+        target = 'users.management.commands.send_emails.get_connection'
+        with mock.patch(target, wraps=get_connection) as connect:
+            call_command('send_emails', batch_size=1)
+        assert connect.call_count == 2, (
+            'Проверьте, что соединение с почтовым сервером открывается для каждой пачки'
+        )
+        assert not OutgoingEmail.objects.filter(sent__isnull=True).exists()
@@ -0,0 +1,105 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+def claims_client(user):
+    from api.authentication import RoleAccessToken
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}')
+    return client
+
+
+class Test12JWTClaims:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_token_contains_claims(self, client, user):
+        from django.contrib.auth.tokens import default_token_generator
+        from rest_framework_simplejwt.tokens import AccessToken
+        data = {
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user)
+        }
+        response = client.post('/api/v1/auth/token/', data=data)
+        token = AccessToken(response.json()['token'])
+        assert (token['username'], token['role']) == (user.username, user.role), (
+            'Проверьте, что токен содержит username и роль пользователя'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_no_user_query(self, admin):
+        client = claims_client(admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/users/')
+        assert response.status_code == 200
+        assert not any('FROM "users_user" WHERE "users_user"."id"' in query['sql']
+                       for query in context.captured_queries), (
+            'Проверьте, что пользователь с ролью в токене не загружается из БД'
+        )
+        response = client.get('/api/v1/users/me/')
+        assert response.json()['bio'] == admin.bio, (
+            'Проверьте, что `/api/v1/users/me/` возвращает полные данные пользователя'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_role_change_and_delete(self, admin):
+        from django.core.cache import cache
+        client = claims_client(admin)
+        admin.role = 'user'
+        admin.save()
+        response = client.get('/api/v1/users/')
+        assert response.status_code == 401, (
+            'Проверьте, что токен, выданный до смены роли, отклоняется'
+        )
+        response = claims_client(admin).get('/api/v1/users/me/')
+        assert response.status_code == 200, (
+            'Проверьте, что новый токен после смены роли принимается'
+        )
+        client = claims_client(admin)
+        admin.bio = 'Новая биография'
+        admin.save()
+        assert client.get('/api/v1/users/me/').status_code == 200, (
+            'Проверьте, что изменение полей без прав не отзывает токены'
+        )
+        admin.delete()
+        cache.clear()
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == 401, (
+            'Проверьте, что токен удалённого пользователя отклоняется '
+            'и без состояния в кеше'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_change_without_cache(self, admin):
+        from django.core.cache import cache
+        from users.models import User
+        client = claims_client(admin)
+        User.objects.filter(pk=admin.pk).update(role='user', token_revision=1)
+        cache.clear()
+        response = client.get('/api/v1/users/')
+        assert response.status_code == 401, (
+            'Проверьте, что при отсутствии состояния в кеше ревизия токенов '
+            'читается из БД, а не берётся из токена'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_user_from_claims(self, admin):
+        from api.authentication import ClaimsJWTAuthentication, RoleAccessToken
+        token = RoleAccessToken.for_user(admin)
+        with CaptureQueriesContext(connection) as context:
+            user = ClaimsJWTAuthentication().get_user(token)
+        assert not context.captured_queries, (
+            'Проверьте, что при состоянии в кеше пользователь строится без запросов к БД'
+        )
+        assert (user.pk, user.username, user.role, user.is_superuser) == (
+            admin.pk, token['username'], token['role'], token['is_superuser']), (
+            'Проверьте, что username, роль и права пользователя берутся из токена'
+        )
+        client = claims_client(admin)
+        admin.username = 'renamed-admin'
+        admin.save()
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что смена username отзывает токен с прежним username'
+        )
+        assert claims_client(admin).get('/api/v1/users/me/').json()['username'] == 'renamed-admin'
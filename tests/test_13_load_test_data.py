@@ -0,0 +1,60 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+class Test13LoadTestData:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_load_test_data(self):
+        from reviews.models import Comment, GenreTitle, Review, Title
+        out = StringIO()
+        call_command('load_test_data', batch_size=10, stdout=out)
+        assert 'записей/с' in out.getvalue(), (
+            'Проверьте, что команда `load_test_data` выводит скорость импорта'
+        )
+        assert (Title.objects.count(), GenreTitle.objects.count(),
+                Review.objects.count(), Comment.objects.count()) == (32, 42, 72, 3), (
+            'Проверьте, что команда `load_test_data` загружает все записи из csv-файлов'
+        )
+        title = Title.objects.get(pk=1)
+        assert title.category_id == 1, (
+            'Проверьте, что команда `load_test_data` загружает категорию произведения'
+        )
+        assert (title.review_count, title.rating) == (2, 10), (
+            'Проверьте, что после импорта рейтинги произведений пересчитаны'
+        )
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.isoformat().startswith('2019-09-24T21:08:21'), (
+            'Проверьте, что команда `load_test_data` сохраняет даты публикации из csv'
+        )
+        assert Comment.objects.filter(pub_date__year=2020).count() == 3
+        call_command('load_test_data', stdout=out)
+        assert Review.objects.count() == 72, (
+            'Проверьте, что повторный импорт не дублирует записи'
+        )
+
+    def test_02_dependencies(self):
+        from reviews.management.commands.load_test_data import Command
+        from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+        from users.models import User
+        dependencies = Command().get_dependencies()
+        assert dependencies[Genre] == dependencies[Category] == dependencies[User] == set()
+        assert dependencies[GenreTitle] == {Title, Genre}
+        assert dependencies[Comment] == {Review, User}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_resume_from_checkpoint(self, tmp_path):
+        import json
+        from reviews.models import Title
+        from users.models import User
+        checkpoint = tmp_path / 'checkpoint.json'
+        checkpoint.write_text(json.dumps(['users.csv']))
+        call_command('load_test_data', checkpoint=str(checkpoint), stdout=StringIO())
+        assert User.objects.count() == 0 and Title.objects.count() == 32, (
+            'Проверьте, что таблицы из файла `--checkpoint` не загружаются повторно'
+        )
+        assert not checkpoint.exists(), (
+            'Проверьте, что после успешного импорта файл `--checkpoint` удаляется'
+        )
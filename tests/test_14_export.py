@@ -0,0 +1,64 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_reviews
+
+
+class Test14Export:
+    url = '/api/v1/export/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_export_endpoint(self, admin_client, user_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        response = user_client.get(f'{self.url}titles/')
+        assert response.status_code == 403, (
+            f'Проверьте, что `{self.url}{{table}}/` доступна только администратору'
+        )
+        response = admin_client.get(f'{self.url}titles/')
+        assert response.status_code == 200
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert lines[0] == 'id,name,year,category,description' and len(lines) == len(titles) + 1, (
+            'Проверьте, что выгрузка произведений совпадает с форматом `titles.csv`'
+        )
+        response = admin_client.get(f'{self.url}review/?output=ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        assert sorted(row['id'] for row in rows) == sorted(review['id'] for review in reviews), (
+            'Проверьте, что выгрузка отзывов в ndjson содержит все отзывы'
+        )
+        assert admin_client.get(f'{self.url}unknown/').status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_export_command(self, admin_client, admin, tmp_path):
+        create_reviews(admin_client, admin)
+        call_command('export_data', path=str(tmp_path), stdout=StringIO())
+        assert (tmp_path / 'comments.csv').exists(), (
+            'Проверьте, что команда `export_data` создаёт файлы в формате `load_test_data`'
+        )
+        header = (tmp_path / 'review.csv').read_text(encoding='utf-8').splitlines()[0]
+        assert header == 'id,title_id,text,author,score,pub_date'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_round_trip(self, admin_client, admin, tmp_path):
+        from datetime import datetime, timezone
+        from reviews.models import Review, Title
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        Review.objects.filter(pk=reviews[0]['id']).update(
+            pub_date=datetime(2019, 9, 24, 21, 8, tzinfo=timezone.utc))
+        review_dates = list(Review.objects.order_by('id').values_list('id', 'pub_date'))
+        Title.objects.filter(pk=titles[0]['id']).update(
+            description='Описание, с запятой\nи переносом строки')
+        expected = list(Title.objects.order_by('id').values_list(
+            'id', 'name', 'year', 'category_id', 'description'))
+        call_command('export_data', path=str(tmp_path), stdout=StringIO())
+        Title.objects.all().delete()
+        call_command('load_test_data', path=str(tmp_path), stdout=StringIO())
+        assert list(Title.objects.order_by('id').values_list(
+            'id', 'name', 'year', 'category_id', 'description')) == expected, (
+            'Проверьте, что выгрузка и повторная загрузка не теряют описание произведений'
+        )
+        assert list(Review.objects.order_by('id').values_list('id', 'pub_date')) == review_dates, (
+            'Проверьте, что повторная загрузка сохраняет даты публикации отзывов'
+        )
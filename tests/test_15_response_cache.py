@@ -0,0 +1,95 @@
+import pytest
+
+from .common import create_comments, create_reviews, create_titles
+
+
+class Test15ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_genres_cache_invalidation(self, client, admin_client):
+        client.get('/api/v1/genres/')
+        response = client.get('/api/v1/genres/')
+        assert response.json()['count'] == 0
+        admin_client.post('/api/v1/genres/', data={'name': 'Ужасы', 'slug': 'horror'})
+        response = client.get('/api/v1/genres/')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что кеш списка жанров сбрасывается при добавлении жанра'
+        )
+        stats = admin_client.get('/api/v1/cache-stats/').json()
+        assert stats['genres'] == {'hit': 1, 'miss': 2}, (
+            'Проверьте счётчики попаданий и промахов кеша `/api/v1/cache-stats/`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_rating_invalidation(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] == 4
+        admin_client.patch(
+            f'{url}reviews/{reviews[0]["id"]}/', data={'score': 8})
+        assert client.get(url).json()['rating'] == 5, (
+            'Проверьте, что кеш произведения сбрасывается при изменении отзыва'
+        )
+        response = client.get(f'{url}reviews/')
+        assert response.json()['count'] == len(reviews)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_query_params_normalized(self, client, admin_client):
+        create_titles(admin_client)
+        first = client.get('/api/v1/titles/?limit=1&offset=1').json()
+        second = client.get('/api/v1/titles/?offset=1&limit=1').json()
+        assert first == second
+        stats = admin_client.get('/api/v1/cache-stats/').json()
+        assert stats['titles']['hit'] == 1, (
+            'Проверьте, что ключ кеша не зависит от порядка параметров запроса'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_author_rename_and_rollback(self, client, admin_client, admin):
+        from django.db import transaction
+        from reviews.models import DataVersion, Review
+        comments, reviews, titles, user, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{url}{reviews[0]["id"]}/comments/'
+        client.get(url)
+        client.get(comments_url)
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'renamed'})
+        authors = {review['author'] for review in client.get(url).json()['results']}
+        assert 'renamed' in authors and user.username not in authors, (
+            'Проверьте, что кеш отзывов сбрасывается при смене имени автора'
+        )
+        authors = {comment['author'] for comment in client.get(comments_url).json()['results']}
+        assert 'renamed' in authors, (
+            'Проверьте, что кеш комментариев сбрасывается при смене имени автора'
+        )
+        stored = dict(DataVersion.objects.values_list('scope', 'version'))
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Review.objects.filter(pk=reviews[0]['id']).first().save()
+                raise RuntimeError
+        assert dict(DataVersion.objects.values_list('scope', 'version')) == stored, (
+            'Проверьте, что версии данных обновляются только после фиксации транзакции'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_comment_count_without_loaded_review(self, client, admin_client, admin):
+        from reviews.models import Comment
+        comments, reviews, titles, user, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        def comment_count():
+            results = client.get(url).json()['results']
+            return {review['id']: review['comment_count'] for review in results}[reviews[0]['id']]
+
+        assert comment_count() == len(comments)
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert comment_count() == len(comments) - 1, (
+            'Проверьте, что кеш отзывов сбрасывается при каскадном удалении '
+            'комментариев вместе с автором'
+        )
+        Comment.objects.create(review_id=reviews[0]['id'], author=admin, text='Ещё')
+        assert comment_count() == len(comments), (
+            'Проверьте, что кеш отзывов сбрасывается при создании комментария '
+            'без загруженного отзыва'
+        )
@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_reviews
+
+
+class Test16ConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_etag(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = admin_client.get(url)
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f'Проверьте, что при GET запросе `{url}` с актуальным `If-None-Match` возвращается статус 304'
+        )
+        assert not any('reviews_review"' in query['sql'] for query in context.captured_queries), (
+            'Проверьте, что ответ 304 формируется без чтения отзывов'
+        )
+        admin_client.patch(f'{url}{reviews[0]["id"]}/', data={'text': 'Новый текст'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, (
+            'Проверьте, что ETag меняется после изменения отзыва'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_titles_last_modified(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url)
+        last_modified = response['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304, (
+            f'Проверьте, что при GET запросе `{url}` с `If-Modified-Since` без изменений возвращается статус 304'
+        )
+        comments_url = f'{url}reviews/{reviews[0]["id"]}/comments/'
+        assert client.get(comments_url).has_header('ETag')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_missing_object_and_shared_versions(self, client, admin_client, admin):
+        from django.core.cache import cache
+        from django.core.management import call_command
+        from reviews.models import Title
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        response = client.get('/api/v1/titles/0/', HTTP_IF_NONE_MATCH='*')
+        assert response.status_code == 404, (
+            'Проверьте, что условные заголовки проверяются только для существующего объекта'
+        )
+        response = client.get('/api/v1/titles/0/reviews/', HTTP_IF_NONE_MATCH='*')
+        assert response.status_code == 404
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        cache.clear()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304, (
+            'Проверьте, что версии данных не теряются при очистке кеша процесса'
+        )
+        Title.objects.filter(pk=titles[0]['id']).update(rating=10)
+        call_command('rebuild_ratings', verbosity=0)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response.json()['rating'] == 4, (
+            'Проверьте, что команды пересчёта обновляют версии данных'
+        )
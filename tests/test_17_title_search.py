@@ -0,0 +1,40 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_titles
+
+
+class Test17TitleSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search_ranked(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        data = {'name': 'Драма без проекта', 'year': 2001, 'genre': ['comedy'],
+                'category': 'films', 'description': 'Про проект'}
+        admin_client.post('/api/v1/titles/', data=data)
+        response = client.get('/api/v1/titles/?search=проект')
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Проект', 'Драма без проекта'], (
+            'Проверьте, что `search` ищет по названию и описанию и упорядочивает по релевантности'
+        )
+        response = client.get('/api/v1/titles/?search=драма года')
+        assert [title['name'] for title in response.json()['results']] == ['Проект'], (
+            'Проверьте, что `search` находит произведения, содержащие все слова запроса'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_search_index_sync(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(f'/api/v1/titles/{titles[1]["id"]}/', data={'name': 'Переименован'})
+        assert client.get('/api/v1/titles/?search=переименован').json()['count'] == 1, (
+            'Проверьте, что поисковый индекс обновляется при изменении произведения'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert client.get('/api/v1/titles/?search=переименован').json()['count'] == 0, (
+            'Проверьте, что произведение удаляется из поискового индекса'
+        )
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        assert 'Проиндексировано произведений: 1' in out.getvalue()
@@ -0,0 +1,69 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+
+class Test18Autocomplete:
+    url = '/api/v1/autocomplete/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_autocomplete(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        client.get(f'{self.url}?q=п')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{self.url}?q=ПРО')
+        assert response.status_code == 200
+        assert [item['name'] for item in response.json()] == ['Проект'], (
+            f'Проверьте, что `{self.url}` находит названия по префиксу без учёта регистра'
+        )
+        assert not context.captured_queries, (
+            f'Проверьте, что `{self.url}` не обращается к БД'
+        )
+        response = client.get(f'{self.url}?q=тУДа')
+        assert response.json() == [{'type': 'title', 'id': titles[0]['id'], 'name': 'Поворот туда'}], (
+            f'Проверьте, что `{self.url}` находит названия по началу любого слова'
+        )
+        response = client.get(f'{self.url}?q=ко&type=genre')
+        assert response.json() == [{'type': 'genre', 'id': response.json()[0]['id'],
+                                    'name': 'Комедия', 'slug': 'comedy'}]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_autocomplete_signals(self, client, admin_client):
+        create_titles(admin_client)
+        client.get(f'{self.url}?q=ф')
+        admin_client.post('/api/v1/genres/', data={'name': 'Фантастика', 'slug': 'sci-fi'})
+        assert [item['name'] for item in client.get(f'{self.url}?q=фа').json()] == ['Фантастика'], (
+            'Проверьте, что индекс автодополнения обновляется при создании объектов'
+        )
+        admin_client.delete('/api/v1/genres/sci-fi/')
+        assert client.get(f'{self.url}?q=фа').json() == [], (
+            'Проверьте, что индекс автодополнения обновляется при удалении объектов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_other_processes_and_rollback(self, client, admin_client, settings):
+        from django.db import transaction
+        from reviews import versions
+        from reviews.models import Genre
+        create_titles(admin_client)
+        client.get(f'{self.url}?q=ф')
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Genre.objects.create(name='Фэнтези', slug='fantasy')
+                raise RuntimeError
+        assert client.get(f'{self.url}?q=фэ').json() == [], (
+            'Проверьте, что откаченные изменения не попадают в индекс автодополнения'
+        )
+        # Импорт в другом процессе: сигналы этого процесса не отправляются.
+        Genre.objects.bulk_create([Genre(name='Фантастика', slug='sci-fi')])
+        versions.bump(versions.ALL)
+        assert client.get(f'{self.url}?q=фа').json() == [], (
+            'Проверьте, что версии данных проверяются не чаще AUTOCOMPLETE_CHECK_INTERVAL'
+        )
+        settings.AUTOCOMPLETE_CHECK_INTERVAL = 0
+        assert [item['name'] for item in client.get(f'{self.url}?q=фа').json()] == ['Фантастика'], (
+            'Проверьте, что индекс автодополнения перестраивается после изменений '
+            'в других процессах'
+        )
@@ -0,0 +1,35 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test19TitleFilters:
+    url = '/api/v1/titles/'
+
+    def names(self, client, query):
+        response = client.get(f'{self.url}?{query}')
+        assert response.status_code == 200
+        return sorted(title['name'] for title in response.json()['results'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_genre_modes(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.names(client, 'genre=horror,drama') == ['Поворот туда', 'Проект'], (
+            'Проверьте, что `genre` со списком slug возвращает произведения с любым из жанров'
+        )
+        assert self.names(client, 'genre=horror,comedy&genre_mode=all') == ['Поворот туда'], (
+            'Проверьте, что `genre_mode=all` возвращает произведения со всеми жанрами'
+        )
+        assert self.names(client, 'genre=horror,drama&genre_mode=all') == []
+        assert self.names(client, 'genre=horror,comedy') == ['Поворот туда'], (
+            'Проверьте, что фильтр по нескольким жанрам не дублирует произведения'
+        )
+        assert self.names(client, 'genre=hor') == [], (
+            'Проверьте, что `genre` сравнивает slug точно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_category_list(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.names(client, 'category=films,books') == ['Поворот туда', 'Проект']
+        assert self.names(client, 'category=film') == []
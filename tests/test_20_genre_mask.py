@@ -0,0 +1,77 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Genre, GenreTitle, Title
+
+from .common import create_titles
+
+
+class Test20GenreMask:
+    url = '/api/v1/titles/'
+
+    def names(self, client, query):
+        response = client.get(f'{self.url}?{query}')
+        assert response.status_code == 200
+        return sorted(title['name'] for title in response.json()['results'])
+
+    def mask(self, *slugs):
+        mask = 0
+        for genre in Genre.objects.filter(slug__in=slugs):
+            mask |= 1 << genre.bit
+        return mask
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_mask_maintained(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert len(set(Genre.objects.values_list('bit', flat=True))) == 3, (
+            'Проверьте, что каждому жанру назначается отдельный бит'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.genre_mask == self.mask('horror', 'comedy'), (
+            'Проверьте, что маска жанров заполняется при создании произведения'
+        )
+        admin_client.patch(f'{self.url}{title.pk}/', data={'genre': ['drama']})
+        title.refresh_from_db()
+        assert title.genre_mask == self.mask('drama'), (
+            'Проверьте, что маска жанров обновляется при изменении жанров'
+        )
+        admin_client.delete('/api/v1/genres/drama/')
+        title.refresh_from_db()
+        assert title.genre_mask == 0, (
+            'Проверьте, что маска жанров обновляется при удалении жанра'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_exclude_filter(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.names(client, 'genre_exclude=comedy') == ['Проект'], (
+            'Проверьте, что `genre_exclude` исключает произведения с жанром'
+        )
+        assert self.names(client, 'genre=horror,drama&genre_exclude=drama') == ['Поворот туда']
+        assert self.names(client, 'genre_exclude=unknown') == ['Поворот туда', 'Проект']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rebuild_command(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        Genre.objects.update(bit=None)
+        Title.objects.update(genre_mask=0)
+        call_command('rebuild_genre_masks', verbosity=0)
+        assert GenreTitle.objects.filter(genre__bit=None).count() == 0
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.genre_mask == self.mask('horror', 'comedy'), (
+            'Проверьте, что `rebuild_genre_masks` пересчитывает маски жанров'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_genre_mode_and_internal_fields(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.names(client, 'genre=horror,comedy&genre_mode=all') == ['Поворот туда'], (
+            'Проверьте, что `genre_mode=all` оставляет произведения со всеми жанрами'
+        )
+        assert self.names(client, 'genre=horror,drama&genre_mode=all') == []
+        assert self.names(client, 'genre=horror,drama') == ['Поворот туда', 'Проект']
+        mask = Title.objects.get(pk=titles[0]['id']).genre_mask
+        for query in (f'genre_mask={mask}', 'score_sum=0', 'trending_score=0'):
+            assert self.names(client, query) == ['Поворот туда', 'Проект'], (
+                'Проверьте, что служебные колонки произведения недоступны для фильтрации'
+            )
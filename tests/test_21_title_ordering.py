@@ -0,0 +1,59 @@
+import pytest
+
+from .common import create_reviews
+
+
+class Test21TitleOrdering:
+    url = '/api/v1/titles/'
+
+    def names(self, client, query):
+        response = client.get(f'{self.url}?{query}')
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    def create(self, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        admin_client.post(
+            f'{self.url}{titles[1]["id"]}/reviews/', data={'text': 'Хорошо', 'score': 9})
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_ordering(self, client, admin_client, admin):
+        self.create(admin_client, admin)
+        assert self.names(client, 'ordering=-rating') == ['Проект', 'Поворот туда'], (
+            'Проверьте, что произведения можно отсортировать по рейтингу `ordering=-rating`'
+        )
+        assert self.names(client, 'ordering=rating') == ['Поворот туда', 'Проект']
+        assert self.names(client, 'ordering=year') == ['Поворот туда', 'Проект'], (
+            'Проверьте, что произведения можно отсортировать по году `ordering=year`'
+        )
+        assert self.names(client, 'ordering=-year') == ['Проект', 'Поворот туда']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_ranges(self, client, admin_client, admin):
+        self.create(admin_client, admin)
+        assert self.names(client, 'rating_min=5') == ['Проект'], (
+            'Проверьте фильтр `rating_min`'
+        )
+        assert self.names(client, 'rating_max=5') == ['Поворот туда'], (
+            'Проверьте фильтр `rating_max`'
+        )
+        assert self.names(client, 'year_min=2010') == ['Проект'], (
+            'Проверьте фильтр `year_min`'
+        )
+        assert self.names(client, 'year_max=2010&year_min=1990') == ['Поворот туда'], (
+            'Проверьте фильтр `year_max`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_cursor(self, client, admin_client, admin):
+        self.create(admin_client, admin)
+        data = client.get(f'{self.url}?pagination=cursor&ordering=-year&limit=1').json()
+        assert [title['name'] for title in data['results']] == ['Проект']
+        data = client.get(data['next']).json()
+        assert [title['name'] for title in data['results']] == ['Поворот туда'], (
+            'Проверьте keyset-пагинацию при сортировке по году'
+        )
+        data = client.get(f'{self.url}?pagination=cursor&ordering=-rating').json()
+        assert 'count' in data, (
+            'Проверьте, что при сортировке по рейтингу используется limit/offset'
+        )
@@ -0,0 +1,64 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title
+
+from .common import create_comments
+
+
+class Test22Counters:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_counters_in_api(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(title_url)
+        assert response.json().get('review_count') == len(reviews), (
+            'Проверьте, что ответ `/api/v1/titles/{title_id}/` содержит `review_count`'
+        )
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        response = client.get(review_url)
+        assert response.json().get('comment_count') == len(comments), (
+            'Проверьте, что ответ `/api/v1/titles/{title_id}/reviews/{review_id}/` содержит `comment_count`'
+        )
+        admin_client.delete(f'{review_url}comments/{comments[0]["id"]}/')
+        response = client.get(review_url)
+        assert response.json()['comment_count'] == len(comments) - 1, (
+            'Проверьте, что `comment_count` уменьшается при удалении комментария'
+        )
+        admin_client.delete(review_url)
+        response = client.get(title_url)
+        assert response.json()['review_count'] == len(reviews) - 1, (
+            'Проверьте, что `review_count` уменьшается при удалении отзыва'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_save_keeps_counters(self, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title = Title.objects.get(pk=titles[0]['id'])
+        review = Review.objects.get(pk=reviews[0]['id'])
+        Title.objects.filter(pk=title.pk).update(review_count=10)
+        Review.objects.filter(pk=review.pk).update(comment_count=10)
+        title.name = 'Новое название'
+        title.save()
+        review.text = 'Новый текст'
+        review.save()
+        title.refresh_from_db()
+        review.refresh_from_db()
+        assert (title.name, title.review_count) == ('Новое название', 10), (
+            'Проверьте, что сохранение произведения не перезаписывает счётчики'
+        )
+        assert (review.text, review.comment_count) == ('Новый текст', 10), (
+            'Проверьте, что сохранение отзыва не перезаписывает счётчики'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rebuild_comment_counts(self, admin_client, admin):
+        comments, reviews, _, _, _ = create_comments(admin_client, admin)
+        Review.objects.update(comment_count=0)
+        call_command('rebuild_comment_counts', '--check', verbosity=0)
+        assert Review.objects.get(pk=reviews[0]['id']).comment_count == 0
+        call_command('rebuild_comment_counts', verbosity=0)
+        assert Review.objects.get(pk=reviews[0]['id']).comment_count == len(comments), (
+            'Проверьте, что `rebuild_comment_counts` пересчитывает количество комментариев'
+        )
@@ -0,0 +1,56 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import ScoreDistribution
+
+from .common import create_reviews
+
+
+class Test23ScoreDistribution:
+
+    def url(self, title_id):
+        return f'/api/v1/titles/{title_id}/score-distribution/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_distribution(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        response = client.get(self.url(titles[0]['id']))
+        assert response.status_code == 200, (
+            'Проверьте, что `/api/v1/titles/{title_id}/score-distribution/` доступен без токена'
+        )
+        data = response.json()
+        assert data['distribution'] == {
+            str(score): int(score in (3, 4, 5)) for score in range(1, 11)
+        }, 'Проверьте, что `distribution` содержит количество отзывов для каждой оценки'
+        assert (data['count'], data['average'], data['median']) == (3, 4, 4)
+        response = client.get(self.url(titles[1]['id']))
+        assert response.json()['count'] == 0
+        assert response.json()['median'] is None
+        assert client.get(self.url(0)).status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_incremental_update(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        review_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        admin_client.patch(review_url, data={'score': 10})
+        data = client.get(self.url(titles[0]['id'])).json()
+        assert (data['distribution']['5'], data['distribution']['10']) == (0, 1), (
+            'Проверьте, что распределение обновляется при изменении оценки'
+        )
+        assert (data['average'], data['median']) == (17 / 3, 4)
+        admin_client.delete(review_url)
+        data = client.get(self.url(titles[0]['id'])).json()
+        assert (data['count'], data['median']) == (2, 3.5), (
+            'Проверьте, что распределение обновляется при удалении отзыва'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rebuild(self, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        ScoreDistribution.objects.all().delete()
+        call_command('rebuild_score_distributions', verbosity=0)
+        distribution = ScoreDistribution.objects.get(title_id=titles[0]['id'])
+        assert distribution.total == 3, (
+            'Проверьте, что `rebuild_score_distributions` восстанавливает распределения'
+        )
+        assert ScoreDistribution.objects.count() == len(titles)
@@ -0,0 +1,120 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import LeaderboardEntry
+
+from .common import create_reviews
+
+
+class Test24Leaderboards:
+
+    @pytest.fixture(autouse=True)
+    def leaderboard_settings(self, settings):
+        settings.LEADERBOARD_SIZE = 1
+        settings.LEADERBOARD_MIN_REVIEWS = 1
+        settings.LEADERBOARD_PRIOR_COUNT = 1
+
+    def top(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что `{url}` доступен без токена'
+        )
+        return [entry['title']['name'] for entry in response.json()]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_top(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        response = client.get('/api/v1/genres/horror/top/')
+        entry = response.json()[0]
+        assert (entry['position'], entry['title']['id']) == (1, titles[0]['id']), (
+            'Проверьте, что `/api/v1/genres/{slug}/top/` возвращает места и произведения'
+        )
+        assert entry['weighted_rating'] == 4, (
+            'Проверьте, что рейтинг учитывает среднюю оценку по всем произведениям'
+        )
+        assert self.top(client, '/api/v1/categories/films/top/') == ['Поворот туда']
+        assert self.top(client, '/api/v1/categories/books/top/') == []
+        assert client.get('/api/v1/genres/unknown/top/').status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_incremental(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        url = '/api/v1/genres/horror/top/'
+        title_url = f'/api/v1/titles/{titles[1]["id"]}/'
+        admin_client.patch(title_url, data={'genre': ['drama', 'horror']})
+        assert self.top(client, url) == ['Поворот туда']
+        response = admin_client.post(f'{title_url}reviews/', data={'text': 'Отлично', 'score': 10})
+        assert self.top(client, url) == ['Проект'], (
+            'Проверьте, что рейтинг жанра обновляется при добавлении отзыва'
+        )
+        admin_client.delete(f'{title_url}reviews/{response.json()["id"]}/')
+        assert self.top(client, url) == ['Поворот туда'], (
+            'Проверьте, что при выбывании произведения рейтинг жанра пересчитывается'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert self.top(client, url) == [], (
+            'Проверьте, что удалённое произведение исключается из рейтинга'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rebuild(self, client, admin_client, admin):
+        create_reviews(admin_client, admin)
+        LeaderboardEntry.objects.all().delete()
+        call_command('rebuild_leaderboards', verbosity=0)
+        assert LeaderboardEntry.objects.count() == 3, (
+            'Проверьте, что `rebuild_leaderboards` пересчитывает рейтинги жанров и категорий'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_limit_and_totals(self, client, admin_client, admin):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.leaderboards import get_mean
+        from reviews.models import ScoreTotals
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        for limit in ('-1', '0', 'x'):
+            response = client.get(f'/api/v1/genres/horror/top/?limit={limit}')
+            assert response.status_code == 400, (
+                'Проверьте, что неположительный `limit` возвращает статус 400'
+            )
+        assert get_mean() == 4
+        with CaptureQueriesContext(connection) as context:
+            admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'text', 'score': 10})
+        assert not any('SUM(' in query['sql'] for query in context.captured_queries), (
+            'Проверьте, что средняя оценка не пересчитывается по всей таблице при добавлении отзыва'
+        )
+        assert get_mean() == 5.5, (
+            'Проверьте, что итоги оценок обновляются при добавлении отзыва'
+        )
+        ScoreTotals.objects.all().delete()
+        assert get_mean() == 5.5
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_title_delete_cascade(self, admin_client, admin):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.leaderboards import get_mean
+        from reviews.models import ScoreTotals, Title
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'text', 'score': 10})
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == 204
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(('UPDATE "reviews_title"', 'UPDATE "reviews_scoredistribution"'))
+        ]
+        assert not updates, (
+            'Проверьте, что при каскадном удалении отзывов не обновляются '
+            'рейтинг и распределение оценок удаляемого произведения'
+        )
+        totals = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_scoretotals"')
+        ]
+        assert len(totals) == 1, (
+            'Проверьте, что итоги оценок уменьшаются один раз за удаление произведения'
+        )
+        assert ScoreTotals.objects.values_list('score_sum', 'review_count').get() == (10, 1)
+        assert get_mean() == 10
+        assert Title.objects.count() == 1
@@ -0,0 +1,61 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Title
+
+from .common import create_comments
+
+
+class Test25Trending:
+    url = '/api/v1/titles/trending/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_trending(self, client, admin_client, admin, settings):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title = Title.objects.get(pk=titles[0]['id'])
+        expected = (len(reviews) * settings.TRENDING_REVIEW_WEIGHT
+                    + len(comments) * settings.TRENDING_COMMENT_WEIGHT)
+        assert title.trending_score == expected, (
+            'Проверьте, что популярность растёт при добавлении отзывов и комментариев'
+        )
+        response = client.get(self.url)
+        assert response.status_code == 200, (
+            f'Проверьте, что `{self.url}` доступен без токена'
+        )
+        assert [item['id'] for item in response.json()] == [titles[0]['id']], (
+            f'Проверьте, что `{self.url}` возвращает только популярные произведения'
+        )
+        admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'text', 'score': 5})
+        response = client.get(self.url)
+        assert [item['id'] for item in response.json()] == [titles[0]['id'], titles[1]['id']], (
+            f'Проверьте, что `{self.url}` упорядочен по убыванию популярности'
+        )
+        assert len(client.get(f'{self.url}?limit=1').json()) == 1
+        for limit in ('-1', '0', 'x'):
+            assert client.get(f'{self.url}?limit={limit}').status_code == 400, (
+                'Проверьте, что неположительный `limit` возвращает статус 400'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_decay(self, client, admin_client, admin, settings):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        score = Title.objects.get(pk=titles[0]['id']).trending_score
+        assert client.get(self.url).json()[0]['id'] == titles[0]['id']
+        call_command('decay_trending', hours=settings.TRENDING_HALF_LIFE, verbosity=0)
+        assert Title.objects.get(pk=titles[0]['id']).trending_score == score / 2, (
+            'Проверьте, что `decay_trending` уменьшает популярность вдвое за период полураспада'
+        )
+        call_command('decay_trending', hours=settings.TRENDING_HALF_LIFE, verbosity=0)
+        assert Title.objects.get(pk=titles[0]['id']).trending_score == pytest.approx(score / 2, rel=1e-3), (
+            'Проверьте, что повторный запуск считает время от прошлого затухания, а не по `--hours`'
+        )
+        settings.TRENDING_MIN_SCORE = score
+        call_command('decay_trending', hours=1, verbosity=0)
+        assert client.get(self.url).json() == [], (
+            'Проверьте, что малая популярность обнуляется'
+        )
+        settings.TRENDING_MIN_SCORE = 0.01
+        call_command('decay_trending', rebuild=True, verbosity=0)
+        assert Title.objects.get(pk=titles[0]['id']).trending_score > score / 2, (
+            'Проверьте, что `decay_trending --rebuild` пересчитывает популярность по датам'
+        )
@@ -0,0 +1,61 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews import similarity
+from reviews.models import DataVersion, SimilarTitle
+
+from .common import create_reviews
+
+
+class Test26SimilarTitles:
+
+    def create(self, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Ужасный фильм', 'year': 2010, 'genre': ['horror'], 'category': 'films'})
+        titles.append(response.json())
+        for title in titles[1:]:
+            admin_client.post(f'/api/v1/titles/{title["id"]}/reviews/', data={'text': 'text', 'score': 5})
+        return titles
+
+    def similar(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/similar/')
+        assert response.status_code == 200, (
+            'Проверьте, что `/api/v1/titles/{title_id}/similar/` доступен без токена'
+        )
+        return [item['title']['id'] for item in response.json()]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_similar(self, client, admin_client, admin):
+        titles = self.create(admin_client, admin)
+        assert self.similar(client, titles[0]['id']) == []
+        call_command('build_similar_titles', verbosity=0)
+        assert DataVersion.objects.filter(scope=similarity.BUILD_SCOPE).exists(), (
+            'Проверьте, что время пересчёта похожих произведений сохраняется в БД '
+            'и видно всем процессам'
+        )
+        assert self.similar(client, titles[0]['id']) == [titles[2]['id'], titles[1]['id']], (
+            'Проверьте, что похожие произведения упорядочены по общим жанрам и авторам отзывов'
+        )
+        with CaptureQueriesContext(connection) as context:
+            client.get(f'/api/v1/titles/{titles[1]["id"]}/similar/')
+        assert len(context.captured_queries) == 4, (
+            'Проверьте, что похожие произведения читаются одним запросом (и запросом жанров) '
+            'после проверки наличия произведения и версий данных'
+        )
+        assert client.get('/api/v1/titles/0/similar/').status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_workers(self, admin_client, admin):
+        self.create(admin_client, admin)
+        call_command('build_similar_titles', verbosity=0)
+        expected = list(SimilarTitle.objects.order_by('title', 'position').values_list(
+            'title', 'similar', 'score'))
+        call_command('build_similar_titles', workers=2, chunk_size=1, top_k=1, verbosity=0)
+        assert list(SimilarTitle.objects.order_by('title', 'position').values_list(
+            'title', 'similar', 'score')) == [
+                item for item in expected
+                if not any(other[0] == item[0] and other[2] > item[2] for other in expected)
+        ], 'Проверьте, что расчёт в нескольких процессах даёт тот же результат'
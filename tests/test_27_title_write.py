@@ -0,0 +1,54 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+class Test27TitleWrite:
+    url = '/api/v1/titles/'
+
+    def post(self, admin_client, genres, name):
+        data = {'name': name, 'year': 2000, 'genre': genres, 'category': 'films'}
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.url, data=data)
+        assert response.status_code == 201
+        return response.json(), len(context.captured_queries)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_fixed_query_count(self, admin_client):
+        Category.objects.create(name='Фильм', slug='films')
+        slugs = [f'genre-{number}' for number in range(10)]
+        for number, slug in enumerate(slugs):
+            Genre.objects.create(name=f'Жанр {number}', slug=slug)
+        _, single = self.post(admin_client, slugs[:1], 'Первое')
+        data, many = self.post(admin_client, slugs, 'Второе')
+        assert single == many, (
+            'Проверьте, что количество SQL-запросов при POST `/api/v1/titles/` '
+            'не зависит от количества жанров'
+        )
+        assert [genre['slug'] for genre in data['genre']] == slugs, (
+            'Проверьте, что ответ содержит все жанры произведения'
+        )
+        assert data['category'] == {'name': 'Фильм', 'slug': 'films'}
+        assert Title.objects.get(pk=data['id']).genre.count() == len(slugs)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_update_and_errors(self, admin_client):
+        Category.objects.create(name='Фильм', slug='films')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        data, _ = self.post(admin_client, ['drama'], 'Первое')
+        response = admin_client.patch(f'{self.url}{data["id"]}/', data={'genre': ['comedy', 'drama']})
+        assert response.status_code == 200
+        assert [genre['slug'] for genre in response.json()['genre']] == ['drama', 'comedy']
+        response = admin_client.patch(f'{self.url}{data["id"]}/', data={'name': 'Новое'})
+        assert [genre['slug'] for genre in response.json()['genre']] == ['drama', 'comedy'], (
+            'Проверьте, что PATCH без `genre` не меняет жанры произведения'
+        )
+        response = admin_client.post(self.url, data={
+            'name': 'Ошибка', 'year': 2000, 'genre': ['drama', 'unknown'], 'category': 'films'})
+        assert response.status_code == 400, (
+            'Проверьте, что POST `/api/v1/titles/` с несуществующим жанром возвращает статус 400'
+        )
+        assert 'genre' in response.json()
@@ -0,0 +1,123 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Genre, Title
+
+from .common import auth_client, create_titles, create_users_api
+
+
+class Test28Bulk:
+    url = '/api/v1/titles/bulk/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_groups(self, admin_client):
+        data = [{'name': 'Ужасы', 'slug': 'horror'},
+                {'name': 'Драма', 'slug': 'drama'}]
+        response = admin_client.post('/api/v1/genres/bulk/', data=data, format='json')
+        assert response.status_code == 201, (
+            'Проверьте, что POST `/api/v1/genres/bulk/` возвращает статус 201'
+        )
+        assert response.json() == data
+        assert Genre.objects.filter(bit=None).count() == 0, (
+            'Проверьте, что жанрам из массового создания назначаются биты маски'
+        )
+        response = admin_client.post('/api/v1/genres/bulk/', data=[
+            {'name': 'Комедия', 'slug': 'comedy'}, {'name': 'Ужасы', 'slug': 'horror'}], format='json')
+        assert response.status_code == 400
+        assert response.json()[0] == {} and 'slug' in response.json()[1], (
+            'Проверьте, что ошибки возвращаются по позициям списка'
+        )
+        assert not Genre.objects.filter(slug='comedy').exists(), (
+            'Проверьте, что при ошибке ничего не сохраняется'
+        )
+        response = admin_client.patch('/api/v1/categories/bulk/', data=[
+            {'name': 'Фильм', 'slug': 'films'}], format='json')
+        assert response.status_code == 400
+        admin_client.post('/api/v1/categories/bulk/', data=[
+            {'name': 'Фильм', 'slug': 'films'}], format='json')
+        response = admin_client.patch('/api/v1/categories/bulk/', data=[
+            {'name': 'Кино', 'slug': 'films'}], format='json')
+        assert response.status_code == 200
+        assert Category.objects.get(slug='films').name == 'Кино'
+        response = admin_client.delete('/api/v1/genres/bulk/', data=['horror', 'unknown'], format='json')
+        assert response.status_code == 400
+        assert response.json() == {'not_found': ['unknown']}
+        response = admin_client.delete('/api/v1/genres/bulk/', data=['horror', 'drama'], format='json')
+        assert response.status_code == 204
+        assert not Genre.objects.exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_titles(self, client, admin_client):
+        create_titles(admin_client)
+        data = [
+            {'name': 'Первое', 'year': 2001, 'genre': ['drama', 'horror'], 'category': 'films'},
+            {'name': 'Второе', 'year': 2002, 'genre': ['comedy'], 'category': 'books'},
+        ]
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == 201, (
+            'Проверьте, что POST `/api/v1/titles/bulk/` возвращает статус 201'
+        )
+        created = response.json()
+        assert [title['name'] for title in created] == ['Первое', 'Второе']
+        assert [genre['slug'] for genre in created[0]['genre']] == ['drama', 'horror']
+        first = Title.objects.get(pk=created[0]['id'])
+        bits = dict(Genre.objects.values_list('slug', 'bit'))
+        assert first.genre_mask == (1 << bits['drama']) | (1 << bits['horror']), (
+            'Проверьте, что маска жанров заполняется при массовом создании'
+        )
+        response = client.get('/api/v1/titles/?search=Первое')
+        assert [title['id'] for title in response.json()['results']] == [first.pk], (
+            'Проверьте, что созданные произведения попадают в поисковый индекс'
+        )
+        response = client.get(f'/api/v1/titles/{first.pk}/score-distribution/')
+        assert response.status_code == 200
+
+        response = admin_client.patch(self.url, data=[
+            {'id': first.pk, 'name': 'Новое', 'genre': ['comedy']},
+            {'id': created[1]['id'], 'category': 'films'},
+        ], format='json')
+        assert response.status_code == 200
+        updated = response.json()
+        assert updated[0]['name'] == 'Новое'
+        assert [genre['slug'] for genre in updated[0]['genre']] == ['comedy']
+        assert updated[1]['category']['slug'] == 'films'
+        first.refresh_from_db()
+        assert first.genre_mask == 1 << bits['comedy']
+
+        response = admin_client.patch(self.url, data=[
+            {'id': first.pk, 'name': 'Ошибка'},
+            {'id': 0, 'genre': ['unknown']},
+        ], format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {} and set(errors[1]) == {'id', 'genre'}
+        assert Title.objects.get(pk=first.pk).name == 'Новое', (
+            'Проверьте, что при ошибке в списке ничего не сохраняется'
+        )
+
+        response = admin_client.delete(self.url, data=['a'], format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что нечисловые id при удалении возвращают статус 400'
+        )
+        response = admin_client.delete(self.url, data=[first.pk, str(created[1]['id'])], format='json')
+        assert response.status_code == 204, (
+            'Проверьте, что id строкой удаляют тот же объект, что и числом'
+        )
+        assert Title.objects.count() == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_limits(self, settings, admin_client):
+        user, _ = create_users_api(admin_client)
+        data = [{'name': 'Ужасы', 'slug': 'horror'}]
+        assert APIClient().post('/api/v1/genres/bulk/', data=data, format='json').status_code == 401
+        response = auth_client(user).post('/api/v1/genres/bulk/', data=data, format='json')
+        assert response.status_code == 403, (
+            'Проверьте, что массовые операции доступны только администратору'
+        )
+        settings.BULK_MAX_ITEMS = 1
+        response = admin_client.post('/api/v1/genres/bulk/', data=data * 2, format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что размер списка ограничен BULK_MAX_ITEMS'
+        )
+        response = admin_client.post('/api/v1/genres/bulk/', data={'name': 'x'}, format='json')
+        assert response.status_code == 400
@@ -0,0 +1,57 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+class Test29MultiGet:
+    url = '/api/v1/titles/'
+
+    def get(self, client, ids):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{self.url}?ids={ids}')
+        return response, len(context.captured_queries)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_order_and_missing(self, client):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        titles = []
+        for number in range(5):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category)
+            title.genre.add(genre)
+            titles.append(title.pk)
+        _, single = self.get(client, titles[0])
+        ids = [titles[3], 0, titles[1], titles[4], titles[1]]
+        response, many = self.get(client, ','.join(map(str, ids)))
+        assert response.status_code == 200, (
+            'Проверьте, что GET `/api/v1/titles/?ids=` возвращает статус 200'
+        )
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [titles[3], titles[1], titles[4]], (
+            'Проверьте, что произведения возвращаются в порядке запроса без повторов'
+        )
+        assert data['not_found'] == [0], (
+            'Проверьте, что ненайденные id перечисляются в `not_found`'
+        )
+        assert data['results'][0]['genre'] == [{'name': 'Драма', 'slug': 'drama'}]
+        assert data['results'][0]['category'] == {'name': 'Фильм', 'slug': 'films'}
+        assert single == many, (
+            'Проверьте, что количество SQL-запросов не зависит от количества id'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_errors(self, client, settings):
+        response, _ = self.get(client, '1,a')
+        assert response.status_code == 400, (
+            'Проверьте, что нечисловые id возвращают статус 400'
+        )
+        settings.TITLES_MAX_IDS = 2
+        response, _ = self.get(client, '1,2,3')
+        assert response.status_code == 400, (
+            'Проверьте, что количество id ограничено TITLES_MAX_IDS'
+        )
+        response, _ = self.get(client, '')
+        assert response.json() == {'results': [], 'not_found': []}
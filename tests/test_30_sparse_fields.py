@@ -0,0 +1,71 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+class Test30SparseFields:
+    url = '/api/v1/titles/'
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return response.json(), context.captured_queries
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles(self, client, admin_client, admin):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        data, queries = self.get(client, f'{self.url}?fields=id,name,rating')
+        assert set(data['results'][0]) == {'id', 'name', 'rating'}, (
+            'Проверьте, что `?fields=` ограничивает поля произведения'
+        )
+        sql = ' '.join(query['sql'] for query in queries)
+        assert 'description' not in sql and 'reviews_genre' not in sql, (
+            'Проверьте, что без `genre` и `description` запрос не загружает '
+            'жанры и описание'
+        )
+        data, queries = self.get(client, f'{self.url}?fields=genre,category&pagination=cursor')
+        assert set(data['results'][0]) == {'genre', 'category'}
+        assert data['results'][0]['genre'], (
+            'Проверьте, что запрошенные жанры загружаются'
+        )
+        data, _ = self.get(client, f'{self.url}{titles[0]["id"]}/?fields=name')
+        assert data == {'name': titles[0]['name']}
+        data, _ = self.get(client, f'{self.url}?ids={titles[0]["id"]}&fields=id')
+        assert data['results'] == [{'id': titles[0]['id']}]
+        response = client.get(f'{self.url}?fields=name,unknown')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное поле в `?fields=` возвращает статус 400'
+        )
+        data, _ = self.get(client, self.url)
+        assert 'description' in data['results'][0], (
+            'Проверьте, что без `?fields=` возвращаются все поля'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_and_comments(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'{self.url}{titles[0]["id"]}/reviews/'
+        data, queries = self.get(client, f'{url}?fields=id,score')
+        assert {tuple(review) for review in data['results']} == {('id', 'score')}, (
+            'Проверьте, что `?fields=` ограничивает поля отзыва'
+        )
+        assert 'users_user' not in ' '.join(query['sql'] for query in queries), (
+            'Проверьте, что без `author` авторы отзывов не загружаются'
+        )
+        _, queries = self.get(client, f'{url}?fields=id&pagination=cursor')
+        assert len(queries) == 3, (
+            'Проверьте, что частичный список отзывов загружается без '
+            'дополнительных запросов на каждый отзыв'
+        )
+        data, _ = self.get(client, f'{url}?fields=author&pagination=cursor')
+        assert {review['author'] for review in data['results']} == {
+            review['author'] for review in reviews}
+        url = f'{url}{reviews[0]["id"]}/comments/'
+        data, _ = self.get(client, f'{url}?fields=text,review')
+        assert sorted(comment['text'] for comment in data['results']) == sorted(
+            comment['text'] for comment in comments)
+        assert {comment['review'] for comment in data['results']} == {reviews[0]['id']}
+        assert set(data['results'][0]) == {'text', 'review'}